@@ -1,22 +1,51 @@
 import numpy as np
 import pandas as pd
+from sklearn.base import clone
 from sklearn.decomposition import PCA
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier, GradientBoostingRegressor
-from sklearn.neighbors import KNeighborsClassifier
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.ensemble import (
+    GradientBoostingClassifier,
+    GradientBoostingRegressor,
+    RandomForestClassifier,
+    RandomForestRegressor,
+)
+from sklearn.neighbors import KNeighborsClassifier, KNeighborsRegressor
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, mean_squared_error
 from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import make_pipeline
+from threadpoolctl import threadpool_limits
 import cv2
 import tensorflow as tf
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Conv2D, MaxPooling2D, Flatten, Dense, Dropout, Input
+import joblib
+from joblib import Parallel, delayed
 import json
 import os
+import re
 from datetime import datetime
 import sqlite3
+import time
 import warnings
 
+from boosting import extend_boosting, feature_importances, make_gradient_boosting, n_boosting_iterations
+from model_tuning import compare_models
+from recommendation import RECOMMEND_CHUNK_ROWS, finite_rows, recommend_batch
+from resource_grid import (
+    DEFAULT_BLOCK_ROWS,
+    feasibility_indexes,
+    grid_features,
+    grid_shape,
+    grid_size,
+    iter_feasible_blocks,
+    iter_grid_blocks,
+    pruning_report,
+    resource_feature_arrays,
+)
+from timetable import DEFAULT_TIME_BUDGET, TimetableSolver
+
 warnings.filterwarnings("ignore")
 
 
@@ -182,40 +211,119 @@ class MLResourceScheduler:
     def __init__(self):
         self.scheduler_model = None
         self.resource_data = []
+        self.pruning_report = None
+        self.timetable_solver = None
+        self._timetable_ids = None
 
     def collect_resource_data(self, classrooms, teachers, time_slots, subjects):
-        """Collect resource utilization data."""
+        """Collect resource utilization data.
+
+        One row per (classroom, teacher, time slot, subject) combination, with
+        the subject varying fastest. Built by broadcasting per-resource feature
+        arrays; use ``iter_resource_blocks`` when the product is too large to hold.
+        """
         print("[v0] Collecting resource scheduling data...")
 
-        resource_matrix = []
-        for classroom in classrooms:
-            for teacher in teachers:
-                for time_slot in time_slots:
-                    for subject in subjects:
-                        features = [
-                            classroom.get('capacity', 30),
-                            teacher.get('current_load', 0),
-                            time_slot.get('preference_score', 0),
-                            subject.get('demand_level', 0)
-                        ]
-                        resource_matrix.append(features)
-
-        return np.array(resource_matrix)
-
-    def train_scheduling_model(self, X, y):
-        """Train ML model for optimal resource scheduling."""
+        arrays = resource_feature_arrays(classrooms, teachers, time_slots, subjects)
+        if grid_size(arrays) == 0:
+            return np.array([])  # as before vectorizing: no combinations, no feature columns
+        return grid_features(arrays)
+
+    def iter_resource_blocks(self, resources, block_size=DEFAULT_BLOCK_ROWS):
+        """Yield ``(start_row, features)`` blocks of the resource matrix without building all of it"""
+        arrays = resource_feature_arrays(
+            resources['classrooms'], resources['teachers'], resources['time_slots'], resources['subjects']
+        )
+        return iter_grid_blocks(arrays, block_size)
+
+    def iter_schedule_predictions(self, resources, block_size=DEFAULT_BLOCK_ROWS):
+        """Score the resource product block by block, yielding ``(start_row, predictions)``"""
+        if self.scheduler_model is None:
+            raise ValueError("Model not trained yet")
+
+        for start, block in self.iter_resource_blocks(resources, block_size):
+            yield start, self.scheduler_model.predict(block)
+
+    def train_scheduling_model(self, X, y, boosting='exact', early_stopping=False, max_samples=None, n_jobs=None):
+        """Train ML model for optimal resource scheduling.
+
+        ``max_samples`` (row count or fraction) trains on a stratified subsample
+        of the resource matrix. ``boosting='hist'`` is multithreaded; ``n_jobs``
+        caps its threads (None uses all cores).
+        """
         print("[v0] Training resource scheduling model...")
 
-        self.scheduler_model = GradientBoostingClassifier(
+        self.scheduler_model = make_gradient_boosting(
+            'classification',
+            backend=boosting,
             n_estimators=100,
             learning_rate=0.1,
             max_depth=6,
+            early_stopping=early_stopping,
             random_state=42
         )
 
+        if max_samples is not None and max_samples < (1.0 if isinstance(max_samples, float) else len(y)):
+            X, y = self._stratified_subsample(X, y, max_samples)
+
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        return self._fit_scheduling_model(X_train, X_test, y_train, y_test, n_jobs)
+
+    def update_scheduling_model(self, X, y, n_new_iterations=25, n_jobs=None):
+        """Incrementally retrain on new data (e.g. one changed term) with warm start.
+
+        The trees already fitted are kept; ``n_new_iterations`` more are grown
+        on ``X``/``y`` to correct the current model where it is wrong, which is
+        much cheaper than refitting on the whole campus history. Warm start
+        needs the same classes as the fitted model; when the new training rows
+        miss one (or add one), the model is refitted from scratch on them.
+        """
+        print("[v0] Updating resource scheduling model...")
+
+        if self.scheduler_model is None:
+            raise ValueError("Model not trained yet")
+
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        if np.array_equal(np.unique(y_train), self.scheduler_model.classes_):
+            extend_boosting(self.scheduler_model, n_new_iterations)
+        else:
+            print("[v0] New data does not have the model's classes; refitting from scratch")
+            self.scheduler_model = clone(self.scheduler_model).set_params(warm_start=False)
+        return self._fit_scheduling_model(X_train, X_test, y_train, y_test, n_jobs)
+
+    @staticmethod
+    def _stratified_subsample(X, y, max_samples):
+        """Class-balanced subsample of ``max_samples`` rows (count or fraction).
 
-        self.scheduler_model.fit(X_train, y_train)
+        Classes with a single row cannot be stratified, so those rows are
+        always kept and the rest of the sample is stratified over the others.
+        """
+        y = np.asarray(y)
+        classes, counts = np.unique(y, return_counts=True)
+        rare = np.isin(y, classes[counts < 2])
+        if not rare.any():
+            X, _, y, _ = train_test_split(X, y, train_size=max_samples, stratify=y, random_state=42)
+            return X, y
+
+        common = np.flatnonzero(~rare)
+        if isinstance(max_samples, float):
+            n_common = int(round(max_samples * len(common)))
+        else:
+            n_common = max_samples - int(rare.sum())
+        if n_common >= len(common):
+            keep = common
+        elif n_common < len(np.unique(y[common])):
+            keep = np.empty(0, dtype=np.int64)
+        else:
+            keep, _ = train_test_split(common, train_size=n_common, stratify=y[common], random_state=42)
+        keep = np.sort(np.concatenate([keep, np.flatnonzero(rare)]))
+        return X[keep], y[keep]
+
+    def _fit_scheduling_model(self, X_train, X_test, y_train, y_test, n_jobs):
+        start = time.perf_counter()
+        with threadpool_limits(limits=n_jobs):
+            self.scheduler_model.fit(X_train, y_train)
+        fit_time = time.perf_counter() - start
 
         predictions = self.scheduler_model.predict(X_test)
         accuracy = accuracy_score(y_test, predictions)
@@ -223,33 +331,191 @@ class MLResourceScheduler:
         return {
             'model': self.scheduler_model,
             'accuracy': float(accuracy),
-            'feature_importance': self.scheduler_model.feature_importances_.tolist()
+            'n_iterations': n_boosting_iterations(self.scheduler_model),
+            'n_samples': len(y_train),
+            'fit_time': fit_time,
+            'feature_importance': feature_importances(self.scheduler_model)
         }
 
-    def optimize_schedule(self, resources):
-        """Generate optimized schedule using trained model"""
+    def generate_candidates(self, resources, block_size=DEFAULT_BLOCK_ROWS):
+        """Yield ``(row_indices, features)`` blocks of the combinations that pass the hard constraints.
+
+        Combinations where the room is too small for the subject, the teacher
+        is not qualified or unavailable, or the room is already booked in that
+        slot are dropped before any features are built (see
+        ``resource_grid.feasibility_indexes`` for the resource fields used).
+        Counts are stored in ``self.pruning_report``.
+        """
+        keys = ('classrooms', 'teachers', 'time_slots', 'subjects')
+        arrays = resource_feature_arrays(*(resources[key] for key in keys))
+        indexes = feasibility_indexes(*(resources[key] for key in keys))
+
+        self.pruning_report = pruning_report(indexes)
+        print(f"[v0] {self.pruning_report['feasible']} of {self.pruning_report['total']} candidates feasible "
+              f"({self.pruning_report['pruned']} pruned)")
+        return iter_feasible_blocks(arrays, indexes, block_size)
+
+    def optimize_schedule(self, resources, block_size=DEFAULT_BLOCK_ROWS, prune=False, output=None):
+        """Generate optimized schedule using trained model.
+
+        By default every combination is scored and the flat prediction array
+        (in ``collect_resource_data`` row order) is returned. Predictions are
+        written block by block; with ``output`` set to a ``.npy`` path they go
+        to a memory-mapped file instead of RAM, for grids too large to hold.
+        To consume them without storing anything, use
+        ``iter_schedule_predictions``. With ``prune=True`` only feasible
+        combinations are scored and a dict with their ``(classroom, teacher,
+        time_slot, subject)`` ids, predictions and the pruning counts is
+        returned instead.
+        """
         print("[v0] Generating optimized schedule...")
 
         if self.scheduler_model is None:
             raise ValueError("Model not trained yet")
 
-        # resources should be a dict with keys classrooms, teachers, time_slots, subjects
-        resource_features = self.collect_resource_data(
-            resources['classrooms'],
-            resources['teachers'],
-            resources['time_slots'],
-            resources['subjects']
+        if prune:
+            return self._optimize_feasible(resources, block_size)
+
+        # resources should be a dict with keys classrooms, teachers, time_slots, subjects.
+        # Only one block of features is alive at a time; the output is filled in place.
+        total = grid_size(resource_feature_arrays(
+            resources['classrooms'], resources['teachers'], resources['time_slots'], resources['subjects']
+        ))
+        dtype = self.scheduler_model.classes_.dtype
+        if output is None:
+            optimal_assignments = np.empty(total, dtype=dtype)
+        else:
+            optimal_assignments = np.lib.format.open_memmap(output, mode='w+', dtype=dtype, shape=(total,))
+        for start, predictions in self.iter_schedule_predictions(resources, block_size):
+            optimal_assignments[start:start + len(predictions)] = predictions
+        if output is not None:
+            optimal_assignments.flush()
+
+        return optimal_assignments
+
+    def _optimize_feasible(self, resources, block_size):
+        rows, predictions = [], []
+        for block_rows, block in self.generate_candidates(resources, block_size):
+            rows.append(block_rows)
+            predictions.append(self.scheduler_model.predict(block))
+
+        ids = self._resource_ids(resources)
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+        positions = np.unravel_index(rows, grid_shape(ids))
+
+        return {
+            'candidates': list(zip(*(axis_ids[pos] for axis_ids, pos in zip(ids, positions)))),
+            'predictions': np.concatenate(predictions).tolist() if predictions else [],
+            'pruning': self.pruning_report
+        }
+
+    @staticmethod
+    def _resource_ids(resources):
+        keys = ('classrooms', 'teachers', 'time_slots', 'subjects')
+        return [np.asarray([item.get('id', i) for i, item in enumerate(resources[key])], dtype=object) for key in keys]
+
+    def build_timetable(self, resources, time_budget=DEFAULT_TIME_BUDGET, block_size=DEFAULT_BLOCK_ROWS,
+                        good_label=1):
+        """Turn the model's scores into a conflict-free timetable.
+
+        Feasible candidates are scored with the model's probability of
+        ``good_label`` (the class marking a good assignment) and handed to
+        ``TimetableSolver`` with cost ``1 - p``. Each
+        subject needs ``subject['hours']`` sessions (default 1). No teacher or
+        classroom is double-booked within a time slot.
+        """
+        print("[v0] Building timetable...")
+
+        if self.scheduler_model is None:
+            raise ValueError("Model not trained yet")
+
+        good = np.flatnonzero(self.scheduler_model.classes_ == good_label)
+        if not len(good):
+            raise ValueError(f"Model has no class {good_label!r}; classes are {self.scheduler_model.classes_.tolist()}")
+
+        rows, costs = [], []
+        for block_rows, block in self.generate_candidates(resources, block_size):
+            rows.append(block_rows)
+            costs.append(1.0 - self.scheduler_model.predict_proba(block)[:, good[0]])
+
+        self._timetable_ids = self._resource_ids(resources)
+        self.timetable_solver = TimetableSolver(
+            np.concatenate(rows) if rows else np.empty(0, dtype=np.int64),
+            np.concatenate(costs) if costs else np.empty(0),
+            grid_shape(self._timetable_ids),
+            [subject.get('hours', 1) for subject in resources['subjects']],
+            time_budget=time_budget
         )
-        optimal_assignments = self.scheduler_model.predict(resource_features)
+        return self._timetable_with_ids(self.timetable_solver.solve())
 
-        return optimal_assignments.tolist()
+    def reschedule_without_teacher(self, teacher_id, time_budget=None):
+        """Repair the last timetable after a teacher becomes unavailable; other sessions stay put"""
+        print(f"[v0] Rescheduling without teacher {teacher_id}...")
+
+        if self.timetable_solver is None:
+            raise ValueError("No timetable built yet")
+
+        teacher = list(self._timetable_ids[1]).index(teacher_id)
+        return self._timetable_with_ids(self.timetable_solver.remove_teacher(teacher, time_budget))
+
+    def _timetable_with_ids(self, solution):
+        rooms, teachers, slots, subjects = self._timetable_ids
+        return {
+            'assignments': [
+                {'time_slot': slots[s], 'classroom': rooms[c], 'teacher': teachers[t], 'subject': subjects[u],
+                 'score': 1.0 - cost}
+                for (c, t, s, u), cost in zip(solution['assignments'], solution['costs'])
+            ],
+            'missing_hours': {subjects[u]: n for u, n in solution['missing_hours'].items()},
+            'objective': solution['objective']
+        }
+
+
+NON_ALPHANUMERIC = re.compile(r'[^a-zA-Z0-9\s]')
+
+# Intent keywords in priority order: the first intent with a matching token wins
+INTENT_KEYWORDS = (
+    ('attendance_query', ('attendance', 'present', 'absent')),
+    ('schedule_query', ('schedule', 'timetable', 'class', 'next')),
+    ('grade_query', ('grade', 'marks', 'score', 'result')),
+)
+DEFAULT_INTENT = 'help_query'
+INTENT_MODEL_PATH = os.path.join('models', 'intent_classifier.joblib')
+INTENT_TOKEN_PATTERN = r"(?u)\b[a-zA-Z0-9]+\b"  # same tokens the keyword rules see
+INTENT_VECTORIZERS = ('tfidf', 'hashing')
+
+
+def make_intent_pipeline(vectorizer='tfidf'):
+    """Sparse text features + multinomial logistic regression for intent classification.
+
+    'tfidf' learns a vocabulary; 'hashing' has a fixed feature space and no
+    vocabulary to store, which suits very large or growing utterance sets.
+    """
+    if vectorizer == 'tfidf':
+        features = [TfidfVectorizer(token_pattern=INTENT_TOKEN_PATTERN, ngram_range=(1, 2),
+                                    sublinear_tf=True, dtype=np.float32)]
+    elif vectorizer == 'hashing':
+        features = [HashingVectorizer(token_pattern=INTENT_TOKEN_PATTERN, ngram_range=(1, 2),
+                                      n_features=2 ** 18, alternate_sign=False, dtype=np.float32),
+                    TfidfTransformer(sublinear_tf=True)]
+    else:
+        raise ValueError(f"vectorizer must be one of {INTENT_VECTORIZERS}, got {vectorizer!r}")
+    return make_pipeline(*features, LogisticRegression(C=10.0, max_iter=1000))
 
 
 class NLPChatbot:
     """Educational chatbot with basic NLP intent classification"""
 
-    def __init__(self):
+    def __init__(self, intent_model_path=INTENT_MODEL_PATH):
         self.intent_classifier = None
+        self.intent_model_path = intent_model_path
+        self._intent_model_checked = False
+        self.intents = [intent for intent, _ in INTENT_KEYWORDS] + [DEFAULT_INTENT]
+        # keyword -> priority of the first intent listing it, built once
+        self.keyword_index = {}
+        for priority, (_, keywords) in enumerate(INTENT_KEYWORDS):
+            for word in keywords:
+                self.keyword_index.setdefault(word, priority)
         self.response_templates = {
             'attendance_query': "Your attendance is {percentage}%. You have attended {present} out of {total} classes.",
             'schedule_query': "Your next class is {subject} at {time} in {room}.",
@@ -259,26 +525,75 @@ class NLPChatbot:
 
     def preprocess_text(self, text):
         """Preprocess user input text"""
-        import re
-
-        text = re.sub(r'[^a-zA-Z0-9\s]', '', text.lower())
+        text = NON_ALPHANUMERIC.sub('', text.lower())
         tokens = text.split()
         return tokens
 
+    def _match_intent(self, tokens):
+        index = self.keyword_index
+        priorities = [index[token] for token in tokens if token in index]
+        return self.intents[min(priorities)] if priorities else DEFAULT_INTENT
+
+    def train_intent_classifier(self, utterance_file, text_column='text', intent_column='intent',
+                                vectorizer='tfidf', save=True):
+        """Fit the intent model from a labelled utterance CSV and (optionally) save it"""
+        print("[v0] Training intent classifier...")
+
+        data = pd.read_csv(utterance_file).dropna(subset=[text_column, intent_column])
+        texts = data[text_column].astype(str).tolist()
+        intents = data[intent_column].astype(str).to_numpy()
+
+        X_train, X_test, y_train, y_test = train_test_split(texts, intents, test_size=0.2, random_state=42)
+        self.intent_classifier = make_intent_pipeline(vectorizer)
+        self.intent_classifier.fit(X_train, y_train)
+        accuracy = accuracy_score(y_test, self.intent_classifier.predict(X_test))
+
+        if save:
+            os.makedirs(os.path.dirname(self.intent_model_path) or '.', exist_ok=True)
+            joblib.dump(self.intent_classifier, self.intent_model_path)
+
+        return {
+            'model': self.intent_classifier,
+            'accuracy': float(accuracy),
+            'n_utterances': len(texts),
+            'intents': self.intent_classifier.classes_.tolist(),
+            'model_path': self.intent_model_path if save else None
+        }
+
+    def _get_intent_classifier(self):
+        """Trained intent model, loaded from disk on first use; None means keyword rules"""
+        if self.intent_classifier is None and not self._intent_model_checked:
+            self._intent_model_checked = True
+            if self.intent_model_path and os.path.exists(self.intent_model_path):
+                self.intent_classifier = joblib.load(self.intent_model_path)
+        return self.intent_classifier
+
     def classify_intent(self, user_input):
-        """Classify user intent using simple keyword rules"""
+        """Classify user intent with the trained model, or simple keyword rules without one"""
         print("[v0] Classifying user intent...")
 
-        tokens = self.preprocess_text(user_input)
+        classifier = self._get_intent_classifier()
+        if classifier is not None:
+            return str(classifier.predict([user_input])[0])
+        return self._match_intent(self.preprocess_text(user_input))
 
-        if any(word in tokens for word in ['attendance', 'present', 'absent']):
-            return 'attendance_query'
-        elif any(word in tokens for word in ['schedule', 'timetable', 'class', 'next']):
-            return 'schedule_query'
-        elif any(word in tokens for word in ['grade', 'marks', 'score', 'result']):
-            return 'grade_query'
-        else:
-            return 'help_query'
+    def classify_intents(self, messages):
+        """Classify a batch of messages (same rules as ``classify_intent``, no per-message logging).
+
+        With a trained model the whole batch goes through one sparse
+        vectorize-and-predict call. Otherwise the batch is lowercased and
+        cleaned in a single regex pass over the joined text, and each token
+        costs one hash lookup in the keyword index.
+        """
+        print(f"[v0] Classifying {len(messages)} messages...")
+
+        if not messages:
+            return []
+        classifier = self._get_intent_classifier()
+        if classifier is not None:
+            return classifier.predict(list(messages)).tolist()
+        text = NON_ALPHANUMERIC.sub('', "\n".join(m.replace("\n", " ") for m in messages).lower())
+        return [self._match_intent(line.split()) for line in text.split("\n")]
 
     def generate_response(self, intent, context_data):
         """Generate appropriate response based on intent"""
@@ -299,15 +614,21 @@ class GradientBoostingRecommender:
         self.gb_weighter = None
         self.gbm_recommender = None
         self.comparison_models = {}
+        self.comparison_cache = {}  # (data/split, model, fold) -> fold result, latest data only
+        self.item_features = None
+        self.item_ids = None
 
-    def train_gb_weighter(self, features, importance_scores):
+    def train_gb_weighter(self, features, importance_scores, boosting='exact', early_stopping=False):
         """Train Gradient Boosting for feature weighting"""
         print("[v0] Training GB weighter...")
 
-        self.gb_weighter = GradientBoostingRegressor(
+        self.gb_weighter = make_gradient_boosting(
+            'regression',
+            backend=boosting,
             n_estimators=100,
             learning_rate=0.1,
             max_depth=6,
+            early_stopping=early_stopping,
             random_state=42
         )
 
@@ -315,17 +636,21 @@ class GradientBoostingRecommender:
 
         return {
             'model': self.gb_weighter,
-            'feature_weights': self.gb_weighter.feature_importances_.tolist()
+            'n_iterations': n_boosting_iterations(self.gb_weighter),
+            'feature_weights': feature_importances(self.gb_weighter)
         }
 
-    def train_gbm_recommender(self, user_item_matrix, ratings):
+    def train_gbm_recommender(self, user_item_matrix, ratings, boosting='exact', early_stopping=False):
         """Train GBM for educational content recommendations"""
         print("[v0] Training GBM recommender...")
 
-        self.gbm_recommender = GradientBoostingRegressor(
+        self.gbm_recommender = make_gradient_boosting(
+            'regression',
+            backend=boosting,
             n_estimators=150,
             learning_rate=0.05,
             max_depth=8,
+            early_stopping=early_stopping,
             random_state=42
         )
 
@@ -341,104 +666,152 @@ class GradientBoostingRecommender:
         return {
             'model': self.gbm_recommender,
             'mse': float(mse),
+            'n_iterations': n_boosting_iterations(self.gbm_recommender),
             'predictions': predictions.tolist()
         }
 
-    def compare_algorithms(self, X, y):
+    def compare_algorithms(self, X, y, cv=5, n_jobs=-1, algorithms=None):
         """
         Compare GBM with PCA, RF, KNN.
-        This function now auto-detects whether y indicates regression or classification
+        This function auto-detects whether y indicates regression or classification
         and uses appropriate models & scoring.
+
+        All models share one fold split and every (model, fold) fit runs in
+        parallel. PCA and the KNN scaler are fitted inside each training fold
+        via pipelines.
+        ``algorithms`` adds or replaces models by name; fold results are cached
+        on the recommender, so re-running with an extra model only fits that
+        model.
         """
         print("[v0] Comparing algorithms...")
 
         y = np.asarray(y)
         is_regression = (y.dtype.kind in 'f') or (len(np.unique(y)) > 20)
 
-        results = {}
-
         if is_regression:
-            # Use regressors and MSE (neg_mean_squared_error for cross_val_score)
-            algorithms = {
+            # Regressors scored by MSE (neg_mean_squared_error, higher is better)
+            scoring, metric = 'neg_mean_squared_error', 'neg_mse'
+            models = {
                 'GBM': GradientBoostingRegressor(n_estimators=100, random_state=42),
-                'RF': GradientBoostingRegressor(n_estimators=100, random_state=42),  # using regressor instead of classifier
-                'KNN': GradientBoostingRegressor(n_estimators=50, random_state=42)   # placeholder - KNN is usually regressor/regressor variant
+                'RF': RandomForestRegressor(n_estimators=100, random_state=42),
+                'KNN': make_pipeline(StandardScaler(), KNeighborsRegressor(n_neighbors=5)),
+                'GBM_with_PCA': make_pipeline(PCA(n_components=0.95),
+                                              GradientBoostingRegressor(n_estimators=100, random_state=42))
             }
-
-            for name, model in algorithms.items():
-                try:
-                    scores = cross_val_score(model, X, y, cv=5, scoring='neg_mean_squared_error')
-                    results[name] = {
-                        'mean_neg_mse': float(np.mean(scores)),
-                        'std_neg_mse': float(np.std(scores)),
-                        'scores': scores.tolist()
-                    }
-                except Exception as e:
-                    results[name] = {'error': str(e)}
-
-            # PCA comparison with GBM
-            try:
-                pca = PCA(n_components=0.95)
-                X_pca = pca.fit_transform(X)
-                gbm_pca = GradientBoostingRegressor(n_estimators=100, random_state=42)
-                pca_scores = cross_val_score(gbm_pca, X_pca, y, cv=5, scoring='neg_mean_squared_error')
-
-                results['GBM_with_PCA'] = {
-                    'mean_neg_mse': float(np.mean(pca_scores)),
-                    'std_neg_mse': float(np.std(pca_scores)),
-                    'n_components': int(pca.n_components_)
-                }
-            except Exception as e:
-                results['GBM_with_PCA'] = {'error': str(e)}
         else:
-            # Classification case
-            algorithms = {
+            scoring, metric = 'accuracy', 'accuracy'
+            models = {
                 'GBM': GradientBoostingClassifier(n_estimators=100, random_state=42),
                 'RF': RandomForestClassifier(n_estimators=100, random_state=42),
-                'KNN': KNeighborsClassifier(n_neighbors=5)
+                'KNN': make_pipeline(StandardScaler(), KNeighborsClassifier(n_neighbors=5)),
+                'GBM_with_PCA': make_pipeline(PCA(n_components=0.95),
+                                              GradientBoostingClassifier(n_estimators=100, random_state=42))
             }
+        models.update(algorithms or {})
+        self.comparison_models = models
 
-            for name, model in algorithms.items():
-                try:
-                    scores = cross_val_score(model, X, y, cv=5, scoring='accuracy')
-                    results[name] = {
-                        'mean_accuracy': float(np.mean(scores)),
-                        'std_accuracy': float(np.std(scores)),
-                        'scores': scores.tolist()
-                    }
-                except Exception as e:
-                    results[name] = {'error': str(e)}
-
-            # PCA + GBM classification (GBM as classifier)
-            try:
-                pca = PCA(n_components=0.95)
-                X_pca = pca.fit_transform(X)
-                gbm_pca = GradientBoostingClassifier(n_estimators=100, random_state=42)
-                pca_scores = cross_val_score(gbm_pca, X_pca, y, cv=5, scoring='accuracy')
-
-                results['GBM_with_PCA'] = {
-                    'mean_accuracy': float(np.mean(pca_scores)),
-                    'std_accuracy': float(np.std(pca_scores)),
-                    'n_components': int(pca.n_components_)
-                }
-            except Exception as e:
-                results['GBM_with_PCA'] = {'error': str(e)}
+        fold_results = compare_models(
+            models, X, y, cv=cv, scoring=scoring, stratified=not is_regression,
+            n_jobs=n_jobs, cache=self.comparison_cache
+        )
+
+        results = {}
+        for name, folds in fold_results.items():
+            errors = [fold['error'] for fold in folds if 'error' in fold]
+            if errors:
+                results[name] = {'error': errors[0]}
+                continue
+            scores = np.array([fold['score'] for fold in folds])
+            results[name] = {
+                f'mean_{metric}': float(np.mean(scores)),
+                f'std_{metric}': float(np.std(scores)),
+                'scores': scores.tolist(),
+                'fit_time': float(sum(fold['fit_time'] for fold in folds))
+            }
+            if 'n_components' in folds[0]:
+                results[name]['n_components'] = [fold['n_components'] for fold in folds]
 
         return results
 
-    def generate_recommendations(self, user_profile, n_recommendations=5):
-        """Generate personalized recommendations"""
+    def set_item_catalogue(self, item_features, item_ids=None):
+        """Items to rank; the recommender is trained on ``[user features | item features]`` rows"""
+        self.item_features = np.atleast_2d(np.asarray(item_features, dtype=np.float64))
+        if item_ids is None:
+            item_ids = range(len(self.item_features))
+        # Plain Python ids, so results and stores serialize cleanly (numpy/pandas ids are np.generic)
+        self.item_ids = [item.item() if isinstance(item, np.generic) else item for item in item_ids]
+
+    def _check_ready(self):
         if self.gbm_recommender is None:
             raise ValueError("GBM recommender not trained yet")
+        if self.item_features is None:
+            raise ValueError("No item catalogue set; call set_item_catalogue first")
+
+    def generate_recommendations(self, user_profile, n_recommendations=5, exclude=None,
+                                 chunk_size=RECOMMEND_CHUNK_ROWS):
+        """Generate personalized recommendations.
 
-        user_features = np.array(user_profile).reshape(1, -1)
-        recommendation_scores = self.gbm_recommender.predict(user_features)
+        The user's features are crossed with every item in the catalogue, all
+        pairs are scored in chunked ``predict`` calls and the best
+        ``n_recommendations`` are picked with ``argpartition``. ``exclude``
+        lists item ids the user should not be offered again.
+        """
+        self._check_ready()
+
+        mask = None
+        # A set first: truth-testing a numpy array or Series of ids is ambiguous
+        excluded = set() if exclude is None else set(exclude)
+        if excluded:
+            mask = np.asarray([[item in excluded for item in self.item_ids]])
+        indices, scores = recommend_batch(
+            self.gbm_recommender, np.asarray(user_profile).reshape(1, -1), self.item_features,
+            n_recommendations, mask, chunk_size
+        )
+        # Fewer than n_recommendations when exclusions leave too few items
+        indices, scores = finite_rows(indices, scores)[0]
 
-        top_indices = np.argsort(recommendation_scores)[-n_recommendations:]
+        return {
+            'recommendations': [self.item_ids[i] for i in indices],
+            'scores': scores
+        }
+
+    def recommend_all(self, user_profiles, n_recommendations=5, n_jobs=-1, batch_size=256,
+                      chunk_size=RECOMMEND_CHUNK_ROWS, output_path=None):
+        """Top-N recommendations for every user, spread over a process pool.
+
+        Meant for the overnight batch: users are split into ``batch_size``
+        groups, each scored in a worker process against the whole catalogue.
+        With ``output_path`` the result is also written as a CSV with one row
+        per (user, rank).
+        """
+        print("[v0] Generating recommendations for all users...")
+        self._check_ready()
+
+        users = np.atleast_2d(np.asarray(user_profiles, dtype=np.float64))
+        batches = Parallel(n_jobs=n_jobs, backend='loky')(
+            delayed(recommend_batch)(
+                self.gbm_recommender, users[start:start + batch_size], self.item_features,
+                n_recommendations, None, chunk_size
+            )
+            for start in range(0, len(users), batch_size)
+        )
+        indices = np.vstack([batch[0] for batch in batches]) if batches else np.empty((0, 0), dtype=np.int64)
+        scores = np.vstack([batch[1] for batch in batches]) if batches else np.empty((0, 0))
+        item_ids = np.asarray(self.item_ids, dtype=object)
+
+        if output_path:
+            n_users, n_top = indices.shape
+            pd.DataFrame({
+                'user': np.repeat(np.arange(n_users), n_top),
+                'rank': np.tile(np.arange(1, n_top + 1), n_users),
+                'item': item_ids[indices.ravel()],
+                'score': scores.ravel()
+            }).to_csv(output_path, index=False)
+            print(f"[v0] Recommendations saved to: {output_path}")
 
         return {
-            'recommendations': top_indices.tolist(),
-            'scores': recommendation_scores[top_indices].tolist()
+            'recommendations': item_ids[indices].tolist(),
+            'scores': scores.tolist()
         }
 
 
@@ -0,0 +1,17 @@
+import importlib.util
+import os
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ADVANCED_MODULE_PATH = os.path.join(SCRIPTS_DIR, 'advanced-ml-algorithms.py')
+
+
+def load_advanced_module():
+    """Execute ``advanced-ml-algorithms.py`` and return it as a module.
+
+    The file name has a hyphen, so it cannot be imported normally. Each call
+    loads a fresh copy.
+    """
+    spec = importlib.util.spec_from_file_location('advanced_ml_algorithms', ADVANCED_MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
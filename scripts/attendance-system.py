@@ -4,6 +4,10 @@ import os, cv2, csv
 import pandas as pd
 import datetime, time
 
+from attendance_session import SessionPolicy, TrackFusion, load_roster, load_thresholds, recognize_faces
+from frame_preview import FramePreview
+from loop_metrics import session_metrics
+
 
 haarcasecade_path = "haarcascade_frontalface_default.xml"
 trainimagelabel_path = "TrainingImageLabel\\Trainner.yml"
@@ -28,55 +32,59 @@ def subjectChoose(text_to_speech):
             df = pd.read_csv(studentdetail_path)
 
             cam = cv2.VideoCapture(0)
-            font = cv2.FONT_HERSHEY_SIMPLEX
             col_names = ["Enrollment", "Name"]
             attendance = pd.DataFrame(columns=col_names)
 
-            # capture for 20 seconds
-            future = time.time() + 20
-            while True:
-                ret, im = cam.read()
-                if not ret:
-                    break
-                gray = cv2.cvtColor(im, cv2.COLOR_BGR2GRAY)
-                faces = facecasCade.detectMultiScale(gray, 1.2, 5)
-
-                for (x, y, w, h) in faces:
-                    Id, conf = recognizer.predict(gray[y:y+h, x:x+w])
-                    if conf < 70:
-                        name = df.loc[df["Enrollment"] == Id]["Name"].values
-                        if len(name) > 0:
-                            name = str(name[0])
+            # capture until the roster is confirmed or the session times out
+            policy = SessionPolicy(load_roster(sub))
+            fusion = TrackFusion(load_thresholds(trainimagelabel_path))
+            with session_metrics("fill_attendance") as metrics, FramePreview("Filling Attendance...", metrics=metrics) as preview:
+                while True:
+                    with metrics.stage("grab"):
+                        ret, im = cam.read()
+                    if not ret:
+                        break
+                    with metrics.stage("convert"):
+                        gray = cv2.cvtColor(im, cv2.COLOR_BGR2GRAY)
+
+                    for (x, y, w, h, Id, conf, accepted) in fusion.update(recognize_faces(gray, facecasCade, recognizer, metrics=metrics)):
+                        if accepted:
+                            policy.observe(Id, conf)
+                            name = df.loc[df["Enrollment"] == Id]["Name"].values
+                            if len(name) > 0:
+                                name = str(name[0])
+                            else:
+                                name = "Unknown"
+
+                            with metrics.stage("write"):
+                                attendance.loc[len(attendance)] = [Id, name]
+
+                            preview.annotate(x, y, w, h, f"{Id}-{name}", (0, 260, 0), (255, 255, 0))
                         else:
-                            name = "Unknown"
-
-                        attendance.loc[len(attendance)] = [Id, name]
-
-                        cv2.rectangle(im, (x, y), (x+w, y+h), (0, 260, 0), 4)
-                        cv2.putText(im, f"{Id}-{name}", (x, y-10), font, 1, (255, 255, 0), 2)
-                    else:
-                        cv2.rectangle(im, (x, y), (x+w, y+h), (0, 25, 255), 4)
-                        cv2.putText(im, "Unknown", (x, y-10), font, 1, (0, 25, 255), 2)
-
-                if time.time() > future:
-                    break
-
-                attendance = attendance.drop_duplicates(["Enrollment"], keep="first")
-                cv2.imshow("Filling Attendance...", im)
-                if cv2.waitKey(30) & 0xFF == 27:  # ESC to exit
-                    break
-
-            # save file
-            ts = time.time()
-            date = datetime.datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
-            timeStamp = datetime.datetime.fromtimestamp(ts).strftime("%H-%M-%S")
-
-            path = os.path.join(attendance_path, sub)
-            os.makedirs(path, exist_ok=True)
-
-            fileName = f"{path}/{sub}_{date}_{timeStamp}.csv"
-            attendance[date] = 1  # mark presence
-            attendance.to_csv(fileName, index=False)
+                            preview.annotate(x, y, w, h, "Unknown", (0, 25, 255))
+
+                    if policy.should_stop():
+                        break
+
+                    with metrics.stage("write"):
+                        attendance = attendance.drop_duplicates(["Enrollment"], keep="first")
+                    key = preview.show(im) & 0xFF
+                    metrics.frame_done()
+                    if key == 27:  # ESC to exit
+                        break
+
+                # save file
+                ts = time.time()
+                date = datetime.datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+                timeStamp = datetime.datetime.fromtimestamp(ts).strftime("%H-%M-%S")
+
+                path = os.path.join(attendance_path, sub)
+                os.makedirs(path, exist_ok=True)
+
+                fileName = f"{path}/{sub}_{date}_{timeStamp}.csv"
+                with metrics.stage("write"):
+                    attendance[date] = 1  # mark presence
+                    attendance.to_csv(fileName, index=False)
 
             cam.release()
             cv2.destroyAllWindows()
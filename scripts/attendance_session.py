@@ -0,0 +1,267 @@
+import csv
+import json
+import os
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+# Detection and acceptance parameters shared by every attendance loop
+DETECT_SCALE_FACTOR = 1.2
+DETECT_MIN_NEIGHBORS = 5
+CONFIDENCE_THRESHOLD = 70  # LBPH distance; lower is a closer match
+
+# Session length policy (seconds) and per-subject rosters
+SESSION_DURATION = 20
+MAX_SESSION_DURATION = 60
+CONFIRMATION_HITS = 3
+roster_path = "Rosters"
+
+# Multi-frame fusion: a track is decided from the last FUSION_WINDOW predictions
+FUSION_WINDOW = 10
+FUSION_MIN_FRAMES = 3
+FUSION_MIN_VOTES = 0.6
+TRACK_IOU = 0.3
+THRESHOLDS_FILE = "thresholds.json"
+
+
+def detect_faces(detector, gray):
+    """Return face boxes (x, y, w, h) found in a grayscale frame"""
+    return detector.detectMultiScale(gray, DETECT_SCALE_FACTOR, DETECT_MIN_NEIGHBORS)
+
+
+def recognize_faces(gray, detector, recognizer, threshold=CONFIDENCE_THRESHOLD, metrics=None):
+    """Detect and identify every face in a grayscale frame.
+
+    Returns a list of ``(x, y, w, h, Id, conf, accepted)`` tuples, where
+    ``accepted`` is True when the LBPH distance is below ``threshold``.
+    When a ``LoopMetrics`` is given, detection and each prediction are timed.
+    """
+    if metrics is None:
+        faces = detect_faces(detector, gray)
+    else:
+        with metrics.stage('detect'):
+            faces = detect_faces(detector, gray)
+
+    results = []
+    for (x, y, w, h) in faces:
+        if metrics is None:
+            Id, conf = recognizer.predict(gray[y:y + h, x:x + w])
+        else:
+            with metrics.stage('predict'):
+                Id, conf = recognizer.predict(gray[y:y + h, x:x + w])
+        results.append((x, y, w, h, Id, conf, conf < threshold))
+    return results
+
+
+def read_enrollments(fileName):
+    """Enrollment numbers listed in a roster or attendance CSV (Enrollment column).
+
+    Files written by pandas may hold them as floats ("12.0") or leave "nan"
+    for missing values, so both forms are accepted.
+    """
+    with open(fileName, newline="") as f:
+        return {
+            int(float(row["Enrollment"]))
+            for row in csv.DictReader(f)
+            if str(row.get("Enrollment", "")).strip() not in ("", "nan")
+        }
+
+
+def load_roster(subject, path=None):
+    """Expected enrollments for a subject from ``Rosters/<subject>.csv`` (Enrollment column), or None"""
+    fileName = os.path.join(path or roster_path, f"{subject}.csv")
+    if not os.path.exists(fileName):
+        return None
+    return read_enrollments(fileName)
+
+
+class SessionPolicy:
+    """Decides when an attendance session can stop.
+
+    A student is confirmed after ``min_hits`` frames recognized with an LBPH
+    distance below ``confidence``. With an expected roster the session ends as
+    soon as everyone on it is confirmed; otherwise it runs for ``duration``.
+    If more than ``extend_missing`` of the roster is still unconfirmed when
+    ``duration`` is up, the session keeps going, up to ``max_duration``.
+    """
+
+    def __init__(self, expected=None, duration=SESSION_DURATION, max_duration=MAX_SESSION_DURATION,
+                 min_hits=CONFIRMATION_HITS, confidence=CONFIDENCE_THRESHOLD, extend_missing=0.1):
+        self.expected = set(expected) if expected else None
+        self.duration = duration
+        self.max_duration = max(max_duration, duration)
+        self.min_hits = min_hits
+        self.confidence = confidence
+        self.extend_missing = extend_missing
+        self.hits = {}
+        self.confirmed = set()
+        self.reason = None
+        self.started = time.time()
+
+    def observe(self, Id, conf):
+        if conf >= self.confidence:
+            return
+        self.hits[Id] = self.hits.get(Id, 0) + 1
+        if self.hits[Id] >= self.min_hits:
+            self.confirmed.add(Id)
+
+    @property
+    def missing(self):
+        return self.expected - self.confirmed if self.expected else set()
+
+    def should_stop(self, now=None):
+        elapsed = (now or time.time()) - self.started
+        if self.expected and not self.missing:
+            self.reason = "roster complete"
+        elif elapsed >= self.max_duration:
+            self.reason = "maximum duration reached"
+        elif elapsed >= self.duration:
+            if self.expected and len(self.missing) > self.extend_missing * len(self.expected):
+                return False
+            self.reason = "duration reached"
+        return self.reason is not None
+
+
+def learn_thresholds(faces, Ids, holdout=0.2, percentile=90, floor=0.5, default=CONFIDENCE_THRESHOLD, seed=42):
+    """Per-student LBPH acceptance thresholds learned from the enrollment images.
+
+    A model is trained without a held-out share of every student's images; each
+    held-out image is then scored against every student by its distance to that
+    student's nearest training image, which is what ``predict`` reports at run
+    time. A student's threshold is the ``percentile`` of their genuine
+    distances, lowered to the 5th percentile of impostor distances so few other
+    students would pass it, and clipped to ``[floor * default, default]`` (never
+    looser than the global one).
+    """
+    rng = np.random.default_rng(seed)
+    Ids = np.asarray(Ids)
+    train_idx, test_idx = [], []
+    for Id in np.unique(Ids):
+        members = rng.permutation(np.flatnonzero(Ids == Id))
+        n_holdout = int(round(len(members) * holdout)) if len(members) > 1 else 0
+        n_holdout = min(max(n_holdout, 1), len(members) - 1) if len(members) > 1 else 0
+        test_idx.extend(members[:n_holdout])
+        train_idx.extend(members[n_holdout:])
+    if not test_idx:
+        return {}
+
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.train([faces[i] for i in train_idx], Ids[train_idx])
+
+    genuine, impostor = {}, {}
+    for i in test_idx:
+        collector = cv2.face.StandardCollector_create()
+        recognizer.predict_collect(faces[i], collector)
+        # The collector lists a distance to every training image; keep each label's nearest
+        nearest = {}
+        for label, distance in collector.getResults():
+            nearest[label] = min(distance, nearest.get(label, np.inf))
+        for label, distance in nearest.items():
+            target = genuine if label == Ids[i] else impostor
+            target.setdefault(int(label), []).append(distance)
+
+    thresholds = {}
+    for Id, distances in genuine.items():
+        threshold = np.percentile(distances, percentile)
+        if Id in impostor:
+            threshold = min(threshold, np.percentile(impostor[Id], 5))
+        thresholds[Id] = float(np.clip(threshold, floor * default, default))
+    return thresholds
+
+
+def save_thresholds(thresholds, model_path):
+    with open(os.path.join(os.path.dirname(model_path), THRESHOLDS_FILE), "w") as f:
+        json.dump({str(Id): threshold for Id, threshold in thresholds.items()}, f, indent=2)
+
+
+def load_thresholds(model_path):
+    """Per-student thresholds saved next to the trained model, or {} if training predates them"""
+    fileName = os.path.join(os.path.dirname(model_path), THRESHOLDS_FILE)
+    if not os.path.exists(fileName):
+        return {}
+    with open(fileName) as f:
+        return {int(Id): threshold for Id, threshold in json.load(f).items()}
+
+
+def box_iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
+
+
+class TrackFusion:
+    """Fuses the per-frame LBPH predictions of each tracked face into one decision.
+
+    Faces are linked across frames by box overlap. A track is accepted as a
+    student once it has ``min_frames`` predictions, at least ``min_votes`` of its
+    last ``window`` predictions agree on the Id, and the mean distance of the
+    agreeing predictions is under that student's threshold. A single lucky
+    frame can therefore no longer mark someone present.
+    """
+
+    def __init__(self, thresholds=None, default=CONFIDENCE_THRESHOLD, window=FUSION_WINDOW,
+                 min_frames=FUSION_MIN_FRAMES, min_votes=FUSION_MIN_VOTES, iou=TRACK_IOU, max_missed=5):
+        self.thresholds = thresholds or {}
+        self.default = default
+        self.window = window
+        self.min_frames = min_frames
+        self.min_votes = min_votes
+        self.iou = iou
+        self.max_missed = max_missed
+        self.tracks = {}
+        self._next_track = 0
+
+    def _associate(self, boxes):
+        pairs = sorted(
+            ((box_iou(track['box'], box), track_id, i)
+             for track_id, track in self.tracks.items() for i, box in enumerate(boxes)),
+            reverse=True
+        )
+        assignment, used_tracks = {}, set()
+        for overlap, track_id, i in pairs:
+            if overlap < self.iou:
+                break
+            if track_id in used_tracks or i in assignment:
+                continue
+            assignment[i] = track_id
+            used_tracks.add(track_id)
+        return assignment
+
+    def _decide(self, track):
+        votes = Counter(Id for Id, _ in track['history'])
+        Id, count = votes.most_common(1)[0]
+        fused_conf = float(np.mean([conf for vote, conf in track['history'] if vote == Id]))
+        accepted = (
+            len(track['history']) >= self.min_frames
+            and count >= self.min_votes * len(track['history'])
+            and fused_conf < self.thresholds.get(Id, self.default)
+        )
+        return Id, fused_conf, accepted
+
+    def update(self, detections):
+        """Take one frame of ``recognize_faces`` output and return it with fused Id, conf and accepted"""
+        assignment = self._associate([d[:4] for d in detections])
+        for track in self.tracks.values():
+            track['missed'] += 1
+
+        results = []
+        for i, (x, y, w, h, Id, conf, _) in enumerate(detections):
+            track_id = assignment.get(i)
+            if track_id is None:
+                track_id = self._next_track
+                self._next_track += 1
+                self.tracks[track_id] = {'history': []}
+            track = self.tracks[track_id]
+            track['box'] = (x, y, w, h)
+            track['missed'] = 0
+            track['history'] = (track['history'] + [(Id, conf)])[-self.window:]
+            results.append((x, y, w, h) + self._decide(track))
+
+        self.tracks = {k: t for k, t in self.tracks.items() if t['missed'] <= self.max_missed}
+        return results
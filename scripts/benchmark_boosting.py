@@ -0,0 +1,91 @@
+import argparse
+import json
+import time
+import warnings
+
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+
+from boosting import make_gradient_boosting, n_boosting_iterations
+
+warnings.filterwarnings('ignore')
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# The current configuration of MLResourceScheduler against the fast backend
+CONFIGURATIONS = {
+    'exact': {'backend': 'exact', 'early_stopping': False},
+    'hist': {'backend': 'hist', 'early_stopping': False},
+    'hist + early stopping': {'backend': 'hist', 'early_stopping': True},
+}
+
+
+def make_dataset(n_samples, n_features, missing_rate, random_state=42):
+    """Synthetic classification data; missing values are only kept for the hist backend"""
+    X, y = make_classification(
+        n_samples=n_samples,
+        n_features=n_features,
+        n_informative=max(n_features // 2, 2),
+        n_classes=3,
+        random_state=random_state
+    )
+    X_missing = X.copy()
+    if missing_rate > 0:
+        rng = np.random.default_rng(random_state)
+        X_missing[rng.random(X.shape) < missing_rate] = np.nan
+    return X, X_missing, y
+
+
+def run_benchmark(sizes, n_features=20, max_depth=6, n_estimators=100, missing_rate=0.0):
+    results = []
+    for n_samples in sizes:
+        X, X_missing, y = make_dataset(n_samples, n_features, missing_rate)
+        for name, config in CONFIGURATIONS.items():
+            # The exact backend cannot handle NaN, so it always gets the complete data
+            data = X if config['backend'] == 'exact' else X_missing
+            X_train, X_test, y_train, y_test = train_test_split(data, y, test_size=0.2, random_state=42)
+
+            model = make_gradient_boosting(
+                'classification',
+                n_estimators=n_estimators,
+                max_depth=max_depth,
+                **config
+            )
+            start = time.perf_counter()
+            model.fit(X_train, y_train)
+            train_time = time.perf_counter() - start
+            accuracy = accuracy_score(y_test, model.predict(X_test))
+
+            results.append({
+                'n_samples': n_samples,
+                'configuration': name,
+                'train_time': train_time,
+                'accuracy': float(accuracy),
+                'n_iterations': n_boosting_iterations(model)
+            })
+            print(f"{n_samples:>8} rows  {name:<22} {train_time:8.2f}s  "
+                  f"accuracy {accuracy:.4f}  iterations {n_boosting_iterations(model)}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare exact and histogram gradient boosting")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="training set sizes")
+    parser.add_argument('--features', type=int, default=20)
+    parser.add_argument('--max-depth', type=int, default=6)
+    parser.add_argument('--n-estimators', type=int, default=100)
+    parser.add_argument('--missing-rate', type=float, default=0.0,
+                        help="fraction of values set to NaN for the hist backend")
+    parser.add_argument('--output', default='boosting_benchmark.json')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, args.features, args.max_depth, args.n_estimators, args.missing_rate)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nBenchmark results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
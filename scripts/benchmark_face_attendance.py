@@ -0,0 +1,320 @@
+import argparse
+import json
+import math
+import os
+import time
+
+import cv2
+import numpy as np
+
+from attendance_session import (
+    CONFIDENCE_THRESHOLD,
+    TrackFusion,
+    box_iou,
+    learn_thresholds,
+    load_thresholds,
+    recognize_faces,
+)
+from loop_metrics import LoopMetrics
+
+haarcasecade_path = "haarcascade_frontalface_default.xml"
+trainimage_path = "TrainingImage"
+trainimagelabel_path = os.path.join("TrainingImageLabel", "Trainner.yml")
+
+MATCH_IOU = 0.4  # a detection counts as a ground-truth face above this overlap
+
+
+def load_enrollment_crops(path):
+    """Read stored enrollment crops as {Id: [gray images]} (layout: Enrollment_Name/Name_Enrollment_n.jpg)"""
+    crops = {}
+    for directory in sorted(os.listdir(path)):
+        directory_path = os.path.join(path, directory)
+        if not os.path.isdir(directory_path):
+            continue
+        for file in sorted(os.listdir(directory_path)):
+            try:
+                Id = int(file.split("_")[1])
+            except (IndexError, ValueError):
+                continue
+            image = cv2.imread(os.path.join(directory_path, file), cv2.IMREAD_GRAYSCALE)
+            if image is not None:
+                crops.setdefault(Id, []).append(image)
+    return crops
+
+
+def split_crops(crops, holdout, seed):
+    """Split each student's crops into (training, rendering) sets so recognition is measured on unseen images
+
+    A student with a single crop cannot be held out without losing their only
+    training image, so they stay in training (as a possible false match) but
+    are never rendered.
+    """
+    rng = np.random.default_rng(seed)
+    train, render = {}, {}
+    for Id, images in crops.items():
+        if len(images) < 2:
+            train[Id] = list(images)
+            continue
+        order = rng.permutation(len(images))
+        n_holdout = min(max(int(round(len(images) * holdout)), 1), len(images) - 1)
+        render[Id] = [images[i] for i in order[:n_holdout]]
+        train[Id] = [images[i] for i in order[n_holdout:]]
+    return train, render
+
+
+def train_recognizer(crops):
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    faces, Ids = [], []
+    for Id, images in crops.items():
+        faces.extend(images)
+        Ids.extend([Id] * len(images))
+    recognizer.train(faces, np.array(Ids))
+    return recognizer
+
+
+class SyntheticFrameStream:
+    """Camera stand-in that renders N enrolled faces per frame at a fixed resolution.
+
+    Mirrors ``cv2.VideoCapture.read``/``release``. With ``realtime=True`` frames are
+    produced on a wall-clock schedule at ``fps``, so a slow consumer skips frames
+    (counted in ``dropped_frames``) exactly like a live camera would. Students keep
+    their place for ``dwell`` consecutive frames (with a new crop and a little
+    jitter each frame), so per-track fusion can link them like people in a room.
+    """
+
+    def __init__(self, crops, faces_per_frame, resolution=(1280, 720), fps=30, n_frames=300,
+                 realtime=False, seed=42, dwell=1):
+        self.crops = crops
+        self.ids = sorted(crops)
+        self.faces_per_frame = min(faces_per_frame, len(self.ids))
+        self.width, self.height = resolution
+        self.fps = fps
+        self.n_frames = n_frames
+        self.realtime = realtime
+        self.dwell = max(dwell, 1)
+        self.layout = None
+        self._layout_index = None
+        self.rng = np.random.default_rng(seed)
+        self.frame_index = -1
+        self.dropped_frames = 0
+        self.ground_truth = []
+        self._start = None
+
+        # Smooth gradient background with mild noise, rendered once
+        gradient = np.linspace(60, 190, self.width, dtype=np.float32)[None, :].repeat(self.height, axis=0)
+        noise = self.rng.normal(0, 6, size=(self.height, self.width)).astype(np.float32)
+        self.background = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+
+        # One grid cell per face keeps faces from overlapping
+        self.cols = max(int(math.ceil(math.sqrt(self.faces_per_frame * self.width / self.height))), 1)
+        self.rows = max(int(math.ceil(self.faces_per_frame / self.cols)), 1)
+
+    def _new_layout(self):
+        """Place a fresh set of students, one per grid cell, as (Id, x, y, size)"""
+        cell_w, cell_h = self.width // self.cols, self.height // self.rows
+        cells = self.rng.choice(self.cols * self.rows, self.faces_per_frame, replace=False)
+        students = self.rng.choice(self.ids, self.faces_per_frame, replace=False)
+        layout = []
+        for cell, Id in zip(cells, students):
+            size = int(min(cell_w, cell_h) * self.rng.uniform(0.6, 0.9))
+            if size < 24:
+                continue
+            x = (cell % self.cols) * cell_w + self.rng.integers(0, cell_w - size + 1)
+            y = (cell // self.cols) * cell_h + self.rng.integers(0, cell_h - size + 1)
+            layout.append((int(Id), int(x), int(y), size))
+        return layout
+
+    def _render(self):
+        layout_index = self.frame_index // self.dwell
+        if layout_index != self._layout_index:
+            self.layout = self._new_layout()
+            self._layout_index = layout_index
+        frame = self.background.copy()
+
+        ground_truth = []
+        for Id, x, y, size in self.layout:
+            crop = self.crops[Id][self.rng.integers(len(self.crops[Id]))]
+            face = cv2.resize(crop, (size, size))
+            if self.dwell > 1:
+                x = int(np.clip(x + self.rng.integers(-2, 3), 0, self.width - size))
+                y = int(np.clip(y + self.rng.integers(-2, 3), 0, self.height - size))
+            frame[y:y + size, x:x + size] = face
+            ground_truth.append((Id, (x, y, size, size)))
+
+        self.ground_truth = ground_truth
+        return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+
+    def read(self):
+        if self.realtime:
+            now = time.perf_counter()
+            if self._start is None:
+                self._start = now
+            due = int((now - self._start) * self.fps)
+            if due > self.frame_index + 1:
+                self.dropped_frames += due - self.frame_index - 1
+            next_index = max(due, self.frame_index + 1)
+            # Wait for the next frame slot like a camera would
+            wait = self._start + next_index / self.fps - now
+            if wait > 0:
+                time.sleep(wait)
+        else:
+            next_index = self.frame_index + 1
+
+        if next_index >= self.n_frames:
+            return False, None
+        self.frame_index = next_index
+        return True, self._render()
+
+    def release(self):
+        pass
+
+
+def _percentiles(values_ms):
+    if not values_ms:
+        return {'p50': None, 'p90': None, 'p99': None}
+    p50, p90, p99 = np.percentile(values_ms, [50, 90, 99])
+    return {'p50': float(p50), 'p90': float(p90), 'p99': float(p99)}
+
+
+def run_benchmark(stream, detector, recognizer, threshold=CONFIDENCE_THRESHOLD, fusion=None):
+    """Run the attendance loop's ``recognize_faces`` over a frame stream and score it against ground truth
+
+    With a ``TrackFusion`` the per-frame predictions are fused per track first,
+    as the attendance loops do, and the fused decisions are scored.
+    """
+    stage_times = LoopMetrics('benchmark', window=None)
+    frame_ms = []
+    gt_faces = detected = recognized = accepted_total = false_accepts = 0
+    processing_time = 0.0
+
+    while True:
+        ret, im = stream.read()
+        if not ret:
+            break
+        frame_start = time.perf_counter()
+        gray = cv2.cvtColor(im, cv2.COLOR_BGR2GRAY)
+
+        detections = recognize_faces(gray, detector, recognizer, threshold, stage_times)
+        if fusion is not None:
+            with stage_times.stage('fuse'):
+                detections = fusion.update(detections)
+        predictions = [((x, y, w, h), Id, accepted) for x, y, w, h, Id, conf, accepted in detections]
+        elapsed = time.perf_counter() - frame_start
+        frame_ms.append(elapsed * 1000)
+        processing_time += elapsed
+
+        # Score against ground truth (outside the timed region)
+        matched = set()
+        for true_id, true_box in stream.ground_truth:
+            gt_faces += 1
+            best = max(range(len(predictions)), key=lambda i: box_iou(predictions[i][0], true_box), default=None)
+            if best is None or box_iou(predictions[best][0], true_box) < MATCH_IOU:
+                continue
+            detected += 1
+            matched.add(best)
+            _, Id, accepted = predictions[best]
+            if accepted and Id == true_id:
+                recognized += 1
+        for i, (_, Id, accepted) in enumerate(predictions):
+            if accepted:
+                accepted_total += 1
+                true_ids = [t for t, box in stream.ground_truth if box_iou(predictions[i][0], box) >= MATCH_IOU]
+                if i not in matched or Id not in true_ids:
+                    false_accepts += 1
+
+    n_frames = len(frame_ms)
+    detect_ms = [seconds * 1000 for seconds in stage_times.samples['detect']]
+    face_ms = [seconds * 1000 for seconds in stage_times.samples['predict']]
+    return {
+        'frames': n_frames,
+        'dropped_frames': stream.dropped_frames,
+        'fps': n_frames / processing_time if processing_time else None,
+        'frame_latency_ms': _percentiles(frame_ms),
+        'detection_latency_ms': _percentiles(detect_ms),
+        'per_face_latency_ms': _percentiles(face_ms),
+        'ground_truth_faces': gt_faces,
+        'detection_rate': detected / gt_faces if gt_faces else None,
+        'recognition_rate': recognized / gt_faces if gt_faces else None,
+        'false_accept_rate': false_accepts / accepted_total if accepted_total else 0.0
+    }
+
+
+def _cascade_path(path):
+    if os.path.exists(path):
+        return path
+    return os.path.join(cv2.data.haarcascades, os.path.basename(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark face attendance on synthetic frame streams")
+    parser.add_argument('--images', default=trainimage_path, help="enrollment crops directory")
+    parser.add_argument('--model', default=trainimagelabel_path,
+                        help="trained LBPH model; ignored with --holdout > 0")
+    parser.add_argument('--cascade', default=haarcasecade_path)
+    parser.add_argument('--faces-per-frame', type=int, nargs='+', default=[1, 5, 10, 20])
+    parser.add_argument('--resolution', default='1280x720', help="WIDTHxHEIGHT")
+    parser.add_argument('--fps', type=float, default=30)
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--realtime', action='store_true', help="pace frames like a live camera")
+    parser.add_argument('--dwell', type=int, default=15,
+                        help="frames each student stays in place, so tracks can be fused across frames")
+    parser.add_argument('--holdout', type=float, default=0.3,
+                        help="fraction of each student's crops kept out of training and used for rendering")
+    parser.add_argument('--threshold', type=float, default=CONFIDENCE_THRESHOLD)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='face_benchmark_results.json')
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.resolution.lower().split('x'))
+    crops = load_enrollment_crops(args.images)
+    if not crops:
+        print(f"No enrollment crops found in {args.images}")
+        return
+
+    untestable = []
+    if args.holdout > 0:
+        train_crops, render_crops = split_crops(crops, args.holdout, args.seed)
+        untestable = sorted(set(crops) - set(render_crops))
+        if untestable:
+            print(f"{len(untestable)} students have a single crop and are not rendered: {untestable}")
+        if not render_crops:
+            print("No student has enough crops to hold any out; use --holdout 0 with a trained --model")
+            return
+        recognizer = train_recognizer(train_crops)
+        faces, Ids = zip(*((image, Id) for Id, images in train_crops.items() for image in images))
+        thresholds = learn_thresholds(list(faces), Ids, default=args.threshold, seed=args.seed)
+    else:
+        render_crops = crops
+        recognizer = cv2.face.LBPHFaceRecognizer_create()
+        recognizer.read(args.model)
+        thresholds = load_thresholds(args.model)
+    detector = cv2.CascadeClassifier(_cascade_path(args.cascade))
+    if detector.empty():
+        print(f"Could not load Haar cascade from {args.cascade}")
+        return
+
+    # Same stream per mode (same seed), so single-frame and fused decisions see identical faces
+    results = []
+    for n_faces in args.faces_per_frame:
+        for mode in ('frame', 'fused'):
+            stream = SyntheticFrameStream(render_crops, n_faces, (width, height), args.fps, args.frames,
+                                          realtime=args.realtime, seed=args.seed, dwell=args.dwell)
+            fusion = TrackFusion(thresholds, default=args.threshold) if mode == 'fused' else None
+            metrics = run_benchmark(stream, detector, recognizer, args.threshold, fusion)
+            metrics.update({'faces_per_frame': stream.faces_per_frame, 'resolution': args.resolution,
+                            'mode': mode})
+            results.append(metrics)
+            fps = f"{metrics['fps']:.1f}" if metrics['fps'] else "n/a"
+            rate = f"{metrics['recognition_rate']:.3f}" if metrics['recognition_rate'] is not None else "n/a"
+            print(f"{stream.faces_per_frame:>3} faces/frame  {mode:<5}  {fps:>7} FPS  "
+                  f"face p90 {metrics['per_face_latency_ms']['p90'] or 0:.2f} ms  "
+                  f"recognition {rate}  false accepts {metrics['false_accept_rate']:.3f}")
+
+    with open(args.output, 'w') as f:
+        json.dump({'students': len(crops), 'untestable_students': untestable, 'config': vars(args),
+                   'results': results}, f, indent=2)
+    print(f"\nBenchmark results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from contextlib import contextmanager
+from datetime import datetime
+
+import matplotlib
+matplotlib.use('Agg')  # plots are timed, never shown
+
+import numpy as np
+
+from advanced_module import load_advanced_module
+from data_processor import DataProcessor
+from hybrid_ml_engine import HybridMLEngine
+from recommendation import RecommendationStore
+from synthetic_data import (
+    attendance_summary,
+    generate_attendance_records,
+    generate_campus_resources,
+    generate_intent_utterances,
+    generate_student_dataset,
+)
+
+warnings.filterwarnings('ignore')
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINES = ('hybrid', 'data_processor', 'advanced')
+REGRESSION_THRESHOLD = 1.2
+
+
+class StageRecorder:
+    """Times named pipeline stages and records the peak traced memory of each"""
+
+    def __init__(self, track_memory=True):
+        self.track_memory = track_memory
+        self.stages = []
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, pipeline, name):
+        if self.track_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        record = {'pipeline': pipeline, 'stage': name, 'time': elapsed}
+        if self.track_memory:
+            record['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        self.stages.append(record)
+        print(f"{pipeline:<15} {name:<32} {elapsed:9.3f}s"
+              + (f"  peak {record['peak_memory_mb']:9.1f} MB" if self.track_memory else ""))
+
+    def add(self, pipeline, name, elapsed):
+        """Record a sub-stage timed elsewhere (no memory measurement)"""
+        self.stages.append({'pipeline': pipeline, 'stage': name, 'time': elapsed})
+        print(f"{pipeline:<15} {name:<32} {elapsed:9.3f}s")
+
+
+def bench_hybrid(recorder, args, workdir):
+    data = generate_student_dataset(
+        n_rows=args.rows, n_numeric=args.numeric, n_categorical=args.categorical,
+        cardinality=args.cardinality, random_state=args.seed
+    )
+    csv_path = os.path.join(workdir, 'students.csv')
+    data.to_csv(csv_path, index=False)
+
+    engine = HybridMLEngine(boosting=args.boosting)
+    with recorder.stage('hybrid', 'load'):
+        engine.load_dataset(csv_path)
+    with recorder.stage('hybrid', 'prepare'):
+        engine.prepare_data('performance', encoding=args.encoding)
+    with recorder.stage('hybrid', 'train (all models)'):
+        engine.train_individual_models(parallel=args.parallel, n_jobs=args.n_jobs)
+    for name, timing in engine.model_timings.items():
+        recorder.add('hybrid', f"fit: {name}", timing['fit_time'])
+        recorder.add('hybrid', f"cv: {name}", timing['cv_time'])
+    with recorder.stage('hybrid', 'ensemble'):
+        engine.create_hybrid_ensemble()
+    with recorder.stage('hybrid', 'plots'):
+        engine.generate_visualizations()
+    with recorder.stage('hybrid', 'report'):
+        engine.generate_report()
+
+
+def bench_data_processor(recorder, args, workdir):
+    records = generate_attendance_records(
+        n_students=args.rows, n_subjects=max(args.numeric, 2), n_sessions=args.sessions, random_state=args.seed
+    )
+    csv_path = os.path.join(workdir, 'attendance_summary.csv')
+    attendance_summary(records).to_csv(csv_path, index=False)
+
+    processor = DataProcessor()
+    with recorder.stage('data_processor', 'load'):
+        processor.load_data(csv_path)
+    with recorder.stage('data_processor', 'statistics'):
+        processor.generate_statistics()
+    with recorder.stage('data_processor', 'plots'):
+        processor.create_visualizations()
+    with recorder.stage('data_processor', 'outliers'):
+        processor.detect_outliers()
+    with recorder.stage('data_processor', 'insights'):
+        processor.generate_insights()
+
+
+def bench_advanced(recorder, args, workdir):
+    with recorder.stage('advanced', 'import'):
+        module = load_advanced_module()
+
+    rng = np.random.default_rng(args.seed)
+    resources = generate_campus_resources(
+        n_classrooms=args.classrooms, n_teachers=args.teachers,
+        n_time_slots=args.time_slots, n_subjects=args.subjects, random_state=args.seed, constraints=True
+    )
+    scheduler = module.MLResourceScheduler()
+    with recorder.stage('advanced', 'scheduler: resource matrix'):
+        X = scheduler.collect_resource_data(
+            resources['classrooms'], resources['teachers'], resources['time_slots'], resources['subjects']
+        )
+    y = (X @ rng.normal(size=X.shape[1]) > 0).astype(int)
+    with recorder.stage('advanced', 'scheduler: train'):
+        scheduler.train_scheduling_model(X, y, boosting=args.boosting)
+    with recorder.stage('advanced', 'scheduler: optimize'):
+        scheduler.optimize_schedule(resources)
+    with recorder.stage('advanced', 'scheduler: optimize (pruned)'):
+        scheduler.optimize_schedule(resources, prune=True)
+
+    utterance_path = os.path.join(workdir, 'utterances.csv')
+    generate_intent_utterances(n_rows=args.rows, random_state=args.seed).to_csv(utterance_path, index=False)
+    chatbot = module.NLPChatbot(intent_model_path=os.path.join(workdir, 'intent_classifier.joblib'))
+    messages = generate_intent_utterances(n_rows=args.rows, random_state=args.seed + 1)['text'].tolist()
+    with recorder.stage('advanced', 'chatbot: keyword batch'):
+        chatbot.classify_intents(messages)
+    with recorder.stage('advanced', 'chatbot: train intents'):
+        chatbot.train_intent_classifier(utterance_path)
+    with recorder.stage('advanced', 'chatbot: model batch'):
+        chatbot.classify_intents(messages)
+
+    recommender = module.GradientBoostingRecommender()
+    X_rec = rng.random((args.rows, args.numeric))
+    ratings = X_rec @ rng.random(args.numeric) + rng.normal(scale=0.1, size=args.rows)
+    with recorder.stage('advanced', 'recommender: train'):
+        recommender.train_gbm_recommender(X_rec, ratings, boosting=args.boosting)
+    with recorder.stage('advanced', 'recommender: compare'):
+        recommender.compare_algorithms(X_rec, ratings)
+
+    # Training rows are [user features | item features]; rank a catalogue built from the item halves
+    split = args.numeric // 2
+    recommender.set_item_catalogue(X_rec[:1000, split:])
+    users = X_rec[:min(args.rows, 2000), :split]
+    with recorder.stage('advanced', 'recommender: top-N single user'):
+        for user in users[:100]:
+            recommender.generate_recommendations(user, 10)
+    with recorder.stage('advanced', 'recommender: top-N all users'):
+        recommender.recommend_all(users, 10)
+    store = RecommendationStore(os.path.join(workdir, 'recommendations.json'))
+    with recorder.stage('advanced', 'recommender: store refresh (full)'):
+        store.refresh(recommender, range(len(users)), users, 10)
+    with recorder.stage('advanced', 'recommender: store refresh (unchanged)'):
+        store.refresh(recommender, range(len(users)), users, 10)
+
+
+BENCHMARKS = {
+    'hybrid': bench_hybrid,
+    'data_processor': bench_data_processor,
+    'advanced': bench_advanced,
+}
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPTS_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare_with_baseline(results, baseline_path, threshold=REGRESSION_THRESHOLD):
+    """Print stages that got slower than ``threshold`` times the baseline run"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(s['pipeline'], s['stage']): s['time'] for s in baseline['stages']}
+
+    print(f"\n=== Comparison with {baseline.get('revision', 'baseline')} ===")
+    regressions = []
+    for stage in results['stages']:
+        key = (stage['pipeline'], stage['stage'])
+        if key not in previous or previous[key] <= 0:
+            continue
+        ratio = stage['time'] / previous[key]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{key[0]:<15} {key[1]:<32} {previous[key]:9.3f}s -> {stage['time']:9.3f}s  x{ratio:.2f}{flag}")
+        if flag:
+            regressions.append({'pipeline': key[0], 'stage': key[1], 'ratio': ratio})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ML pipelines on synthetic data")
+    parser.add_argument('--pipelines', nargs='+', choices=PIPELINES, default=list(PIPELINES))
+    parser.add_argument('--rows', type=int, default=5000, help="students / training rows")
+    parser.add_argument('--numeric', type=int, default=8, help="numeric columns (subjects for attendance)")
+    parser.add_argument('--categorical', type=int, default=3)
+    parser.add_argument('--cardinality', type=int, default=20, help="distinct values per categorical column")
+    parser.add_argument('--sessions', type=int, default=40, help="attendance sessions per subject")
+    parser.add_argument('--classrooms', type=int, default=10)
+    parser.add_argument('--teachers', type=int, default=20)
+    parser.add_argument('--time-slots', type=int, default=20)
+    parser.add_argument('--subjects', type=int, default=20)
+    parser.add_argument('--encoding', default='dense')
+    parser.add_argument('--boosting', default='exact')
+    parser.add_argument('--parallel', action='store_true')
+    parser.add_argument('--n-jobs', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-memory', action='store_true', help="skip tracemalloc (lower overhead)")
+    parser.add_argument('--output', default='ml_benchmark_results.json')
+    parser.add_argument('--baseline', default=None, help="previous results file to compare against")
+    args = parser.parse_args()
+
+    recorder = StageRecorder(track_memory=not args.no_memory)
+    output_path = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    original_dir = os.getcwd()
+
+    # Pipelines write their plots and reports to the working directory
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            for pipeline in args.pipelines:
+                print(f"\n=== Benchmarking {pipeline} ===")
+                BENCHMARKS[pipeline](recorder, args, workdir)
+        finally:
+            os.chdir(original_dir)
+
+    results = {
+        'revision': _git_revision(),
+        'timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'config': vars(args),
+        'stages': recorder.stages
+    }
+    if baseline_path:
+        results['regressions'] = compare_with_baseline(results, baseline_path)
+
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nBenchmark results saved to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+import csv
+import datetime
+import os
+import time
+from collections import OrderedDict
+
+from advanced_module import load_advanced_module
+from attendance_session import load_roster, read_enrollments, roster_path
+
+attendance_path = "Attendance"
+timetable_path = os.path.join("Timetable", "timetable.csv")
+
+CONTEXT_CACHE_SIZE = 4096  # students
+CONTEXT_TTL = 60.0  # seconds a cached student context stays valid
+REFRESH_INTERVAL = 10.0  # minimum seconds between rescans of the attendance folder
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+NO_UPCOMING_CLASS = "You have no upcoming classes."
+
+
+class AttendanceStore:
+    """Per-student attendance counts built from the Attendance/<subject>/*.csv session files.
+
+    Every session file lists the students marked present. Session and roster
+    files are re-read only when they are new or their mtime changed, and the
+    folders are rescanned
+    at most every ``refresh_interval`` seconds. A student's total sessions per
+    subject come from Rosters/<subject>.csv when it lists them, otherwise from
+    the subjects they have attended at least once.
+
+    ``refresh`` runs in a worker thread while lookups run on the event loop,
+    so the derived roster and counts are rebuilt aside and swapped in as one
+    tuple; a lookup never sees a half-updated mix.
+    """
+
+    def __init__(self, path=attendance_path, rosters=roster_path, refresh_interval=REFRESH_INTERVAL):
+        self.path = path
+        self.rosters = rosters
+        self.refresh_interval = refresh_interval
+        self.sessions = {}  # file -> (subject, mtime, enrollments); only touched by refresh
+        self.roster_files = {}  # subject -> (mtime, enrollments); only touched by refresh
+        # (roster: subject -> enrollments, present: enrollment -> {subject: sessions present},
+        #  totals: subject -> sessions held), replaced as a whole
+        self._state = ({}, {}, {})
+        self._last_scan = None
+
+    def refresh(self, force=False):
+        """Rescan the folders; returns True when anything changed"""
+        now = time.monotonic()
+        if not force and self._last_scan is not None and now - self._last_scan < self.refresh_interval:
+            return False
+        self._last_scan = now
+
+        changed = False
+        seen = set()
+        if os.path.isdir(self.path):
+            for subject in os.listdir(self.path):
+                folder = os.path.join(self.path, subject)
+                if not os.path.isdir(folder):
+                    continue
+                for file in os.listdir(folder):
+                    if not file.endswith(".csv"):
+                        continue
+                    fileName = os.path.join(folder, file)
+                    seen.add(fileName)
+                    mtime = os.stat(fileName).st_mtime_ns
+                    cached = self.sessions.get(fileName)
+                    if cached is None or cached[1] != mtime:
+                        self.sessions[fileName] = (subject, mtime, read_enrollments(fileName))
+                        changed = True
+        for fileName in set(self.sessions) - seen:
+            del self.sessions[fileName]
+            changed = True
+
+        subjects = set()
+        if os.path.isdir(self.rosters):
+            for file in os.listdir(self.rosters):
+                if not file.endswith(".csv"):
+                    continue
+                subject = file[:-4]
+                subjects.add(subject)
+                mtime = os.stat(os.path.join(self.rosters, file)).st_mtime_ns
+                cached = self.roster_files.get(subject)
+                if cached is None or cached[0] != mtime:
+                    self.roster_files[subject] = (mtime, load_roster(subject, self.rosters))
+                    changed = True
+        for subject in set(self.roster_files) - subjects:
+            del self.roster_files[subject]
+            changed = True
+
+        if changed:
+            self._rebuild()
+        return changed
+
+    def _rebuild(self):
+        roster = {subject: enrollments for subject, (_, enrollments) in self.roster_files.items()}
+        present, totals = {}, {}
+        for subject, _, enrollments in self.sessions.values():
+            totals[subject] = totals.get(subject, 0) + 1
+            for enrollment in enrollments:
+                counts = present.setdefault(enrollment, {})
+                counts[subject] = counts.get(subject, 0) + 1
+        self._state = (roster, present, totals)
+
+    @property
+    def roster(self):
+        return self._state[0]
+
+    @property
+    def present(self):
+        return self._state[1]
+
+    @property
+    def totals(self):
+        return self._state[2]
+
+    @staticmethod
+    def _subjects(state, enrollment):
+        roster, present, _ = state
+        subjects = {subject for subject, members in roster.items() if enrollment in members}
+        return subjects | set(present.get(enrollment, {}))
+
+    def subjects_for(self, enrollment):
+        return self._subjects(self._state, enrollment)
+
+    def summary(self, enrollment):
+        state = self._state
+        _, present, totals = state
+        counts = present.get(enrollment, {})
+        subjects = self._subjects(state, enrollment)
+        total = sum(totals.get(subject, 0) for subject in subjects)
+        present = sum(counts.get(subject, 0) for subject in subjects)
+        if not total:
+            return {}
+        return {'present': present, 'total': total, 'percentage': round(100.0 * present / total, 1)}
+
+
+class TimetableStore:
+    """Weekly timetable from a CSV with Subject, Day, Time (HH:MM) and Room columns"""
+
+    def __init__(self, path=timetable_path):
+        self.path = path
+        self.entries = []
+        self._mtime = None
+
+    def refresh(self):
+        """Re-read the timetable if it changed; returns True when it did"""
+        if not os.path.exists(self.path):
+            changed = self._mtime is not None
+            self.entries = []
+            self._mtime = None
+            return changed
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        entries = []
+        with open(self.path, newline="") as f:
+            for row in csv.DictReader(f):
+                try:
+                    day = WEEKDAYS.index(row["Day"].strip().lower())
+                    start = datetime.datetime.strptime(row["Time"].strip(), "%H:%M").time()
+                except (KeyError, ValueError):
+                    continue
+                entries.append((row["Subject"].strip(), day, start, row.get("Room", "").strip()))
+        self.entries = entries
+        return True
+
+    def next_class(self, subjects, now=None):
+        """Next timetabled class among ``subjects`` ({} if none); ``subjects=None`` means any subject"""
+        now = now or datetime.datetime.now()
+        best = None
+        for subject, day, start, room in self.entries:
+            if subjects is not None and subject not in subjects:
+                continue
+            days_ahead = (day - now.weekday()) % 7
+            when = datetime.datetime.combine(now.date() + datetime.timedelta(days=days_ahead), start)
+            if when <= now:
+                when += datetime.timedelta(days=7)
+            if best is None or when < best[0]:
+                best = (when, subject, room)
+        if best is None:
+            return {}
+        when, subject, room = best
+        return {'subject': subject, 'time': when.strftime("%A %H:%M"), 'room': room}
+
+
+class ChatbotService:
+    """Asyncio front end for ``NLPChatbot`` that fills answers from the attendance and timetable stores.
+
+    Per-student context is kept in an LRU cache with a TTL, and concurrent
+    queries for the same student share one lookup. Folder scans run in a
+    worker thread, and CSVs are only re-read when they changed, so the event
+    loop is never blocked on disk for ordinary messages.
+    """
+
+    def __init__(self, chatbot=None, attendance=None, timetable=None,
+                 cache_size=CONTEXT_CACHE_SIZE, ttl=CONTEXT_TTL):
+        if chatbot is None:
+            chatbot = load_advanced_module().NLPChatbot()
+        self.chatbot = chatbot
+        self.attendance = attendance or AttendanceStore()
+        self.timetable = timetable or TimetableStore()
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self._cache = OrderedDict()  # enrollment -> (expires, context)
+        self._pending = {}  # enrollment -> Future of an in-flight lookup
+        self._refresh_lock = asyncio.Lock()
+
+    async def _refresh_stores(self):
+        async with self._refresh_lock:
+            attendance_changed = await asyncio.to_thread(self.attendance.refresh)
+            timetable_changed = await asyncio.to_thread(self.timetable.refresh)
+        if attendance_changed or timetable_changed:
+            self._cache.clear()
+
+    def _build_context(self, enrollment):
+        context = self.attendance.summary(enrollment)
+        context.update(self.timetable.next_class(self.attendance.subjects_for(enrollment)))
+        return context
+
+    async def get_context(self, enrollment):
+        entry = self._cache.get(enrollment)
+        if entry is not None and entry[0] > time.monotonic():
+            self._cache.move_to_end(enrollment)
+            return entry[1]
+        if enrollment in self._pending:
+            return await self._pending[enrollment]
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[enrollment] = future
+        try:
+            await self._refresh_stores()
+            context = self._build_context(enrollment)
+            self._cache[enrollment] = (time.monotonic() + self.ttl, context)
+            self._cache.move_to_end(enrollment)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            future.set_result(context)
+            return context
+        except asyncio.CancelledError:
+            future.cancel()  # waiters must not hang on a lookup that will never finish
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it retrieved: the error is raised here, and to any waiters, but asyncio
+            # would otherwise log it as never retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self._pending[enrollment]
+
+    async def answer_many(self, queries):
+        """Answer ``(enrollment, message)`` pairs; intents are classified as one batch"""
+        queries = list(queries)
+        intents = self.chatbot.classify_intents([message for _, message in queries])
+        contexts = await asyncio.gather(*(self.get_context(enrollment) for enrollment, _ in queries))
+        return [
+            NO_UPCOMING_CLASS if intent == 'schedule_query' and 'subject' not in context
+            else self.chatbot.generate_response(intent, context)
+            for intent, context in zip(intents, contexts)
+        ]
+
+    async def answer(self, enrollment, message):
+        return (await self.answer_many([(enrollment, message)]))[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer student questions from attendance and timetable data")
+    parser.add_argument('enrollment', type=int)
+    parser.add_argument('messages', nargs='+')
+    parser.add_argument('--attendance', default=attendance_path)
+    parser.add_argument('--rosters', default=roster_path)
+    parser.add_argument('--timetable', default=timetable_path)
+    args = parser.parse_args()
+
+    service = ChatbotService(
+        attendance=AttendanceStore(args.attendance, args.rosters),
+        timetable=TimetableStore(args.timetable)
+    )
+    answers = asyncio.run(service.answer_many([(args.enrollment, message) for message in args.messages]))
+    for message, answer in zip(args.messages, answers):
+        print(f"> {message}\n{answer}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 - enables the multithreaded CSV engine and binary caches
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+SCHEMA_SAMPLE_ROWS = 10000
+CATEGORY_MAX_UNIQUE_RATIO = 0.5  # object columns below this unique/rows ratio become categoricals
+SCHEMA_SUFFIX = ".schema.json"
+BINARY_CACHE_FORMATS = ("feather", "parquet")
+INGESTION_CACHE_DIR = ".ingestion_cache"
+SAFE_INT_DTYPE = np.int32  # narrower integers overflow too easily in later arithmetic
+# The default C parser can be off by one ulp; round-trip parsing matches the Arrow parser exactly
+FLOAT_PRECISION = 'round_trip'
+
+
+def _file_signature(file_path):
+    """Size and modification time, used to invalidate cached schemas and frames"""
+    stat = os.stat(file_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _cache_stem(file_path, cache_dir):
+    """Cache file prefix inside ``cache_dir``, unique per absolute CSV path"""
+    digest = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{os.path.basename(file_path)}-{digest}")
+
+
+def schema_cache_path(file_path, cache_dir=INGESTION_CACHE_DIR):
+    return f"{_cache_stem(file_path, cache_dir)}{SCHEMA_SUFFIX}"
+
+
+def binary_cache_path(file_path, cache_format, cache_dir=INGESTION_CACHE_DIR):
+    return f"{_cache_stem(file_path, cache_dir)}.{cache_format}"
+
+
+def infer_schema(file_path, sample_rows=SCHEMA_SAMPLE_ROWS):
+    """Infer a column schema from the first ``sample_rows`` rows of a CSV file.
+
+    Each column is classified as 'numeric', 'bool', 'category' or 'string'. Only
+    the string/category split is enforced at read time; numeric widths are chosen
+    after the full read so a sample can never truncate values.
+    """
+    sample = pd.read_csv(file_path, nrows=sample_rows)
+    columns = {}
+    for col in sample.columns:
+        series = sample[col]
+        if pd.api.types.is_bool_dtype(series):
+            columns[col] = 'bool'
+        elif pd.api.types.is_numeric_dtype(series):
+            columns[col] = 'numeric'
+        else:
+            n_valid = max(int(series.notna().sum()), 1)
+            unique_ratio = series.nunique(dropna=True) / n_valid
+            columns[col] = 'category' if unique_ratio <= CATEGORY_MAX_UNIQUE_RATIO else 'string'
+
+    return {
+        'signature': _file_signature(file_path),
+        'sample_rows': int(min(sample_rows, len(sample))),
+        'columns': columns
+    }
+
+
+def load_schema(file_path, sample_rows=SCHEMA_SAMPLE_ROWS, cache_dir=INGESTION_CACHE_DIR):
+    """Return the schema cached in ``cache_dir``, re-inferring it if the file changed
+
+    With ``cache_dir=None`` the schema is inferred every time and nothing is written.
+    """
+    if cache_dir is None:
+        return infer_schema(file_path, sample_rows)
+    cache_path = schema_cache_path(file_path, cache_dir)
+    signature = _file_signature(file_path)
+
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path) as f:
+                schema = json.load(f)
+            if schema.get('signature') == signature:
+                return schema
+        except (OSError, ValueError):
+            pass
+
+    schema = infer_schema(file_path, sample_rows)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_path, 'w') as f:
+            json.dump(schema, f, indent=2)
+    except OSError:
+        pass  # read-only cache directories still work, just without the cache
+    return schema
+
+
+def downcast_frame(df, schema=None):
+    """Shrink numeric columns to the smallest safe dtype and convert repetitive strings to categoricals
+
+    Integers are narrowed to int32 at most, never int8/int16, so arithmetic on
+    them later does not overflow. Floats become float32 only when every value
+    round-trips exactly.
+    """
+    column_kinds = (schema or {}).get('columns', {})
+
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            info = np.iinfo(SAFE_INT_DTYPE)
+            if series.dtype.itemsize > info.bits // 8 and len(series) and \
+                    info.min <= series.min() and series.max() <= info.max:
+                nullable = isinstance(series.dtype, pd.api.extensions.ExtensionDtype)
+                df[col] = series.astype('Int32' if nullable else SAFE_INT_DTYPE)
+        elif pd.api.types.is_float_dtype(series):
+            downcast = pd.to_numeric(series, downcast='float')
+            # Only keep float32 when it reproduces every observed value exactly
+            if np.array_equal(downcast.to_numpy(dtype=np.float64), series.to_numpy(dtype=np.float64), equal_nan=True):
+                df[col] = downcast
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        elif column_kinds.get(col) == 'category':
+            df[col] = series.astype('category')
+        elif HAS_PYARROW and column_kinds.get(col) == 'string':
+            df[col] = series.astype('string[pyarrow]')
+
+    return df
+
+
+def _read_binary_cache(file_path, cache_format, signature, cache_dir):
+    path = binary_cache_path(file_path, cache_format, cache_dir)
+    meta_path = f"{path}.json"
+    if not (os.path.exists(path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path) as f:
+            if json.load(f).get('signature') != signature:
+                return None
+        if cache_format == 'feather':
+            return pd.read_feather(path)
+        return pd.read_parquet(path)
+    except Exception:
+        return None
+
+
+def _write_binary_cache(df, file_path, cache_format, signature, cache_dir):
+    path = binary_cache_path(file_path, cache_format, cache_dir)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        if cache_format == 'feather':
+            df.reset_index(drop=True).to_feather(path)
+        else:
+            df.to_parquet(path, index=False)
+        with open(f"{path}.json", 'w') as f:
+            json.dump({'signature': signature}, f)
+    except Exception:
+        pass  # a failed cache write should never fail the load
+
+
+def read_csv_fast(file_path, cache_format=None, downcast=False, sample_rows=SCHEMA_SAMPLE_ROWS,
+                  cache_dir=INGESTION_CACHE_DIR):
+    """Load a CSV file with a cached schema, the Arrow parser and optional binary caching.
+
+    Schemas are cached in ``cache_dir`` (``None`` disables all caching, nothing
+    is written next to the CSV). ``cache_format`` may be 'feather' or 'parquet';
+    when set, the typed frame is also stored there and returned directly on
+    later runs until the CSV changes. ``downcast`` opts in to ``downcast_frame``.
+    Without pyarrow installed this falls back to the pandas C parser (with
+    round-trip float parsing, so values are identical) and skips the binary
+    cache.
+    """
+    if cache_format is not None and cache_format not in BINARY_CACHE_FORMATS:
+        raise ValueError(f"cache_format must be one of {BINARY_CACHE_FORMATS}, got {cache_format!r}")
+
+    # The cached frame depends on the downcast choice as well as the CSV
+    signature = {**_file_signature(file_path), 'downcast': bool(downcast)}
+    use_binary_cache = cache_format is not None and cache_dir is not None and HAS_PYARROW
+
+    if use_binary_cache:
+        cached = _read_binary_cache(file_path, cache_format, signature, cache_dir)
+        if cached is not None:
+            return cached
+
+    schema = load_schema(file_path, sample_rows, cache_dir)
+    dtype = {col: 'category' for col, kind in schema['columns'].items() if kind == 'category'}
+
+    read_kwargs = {'dtype': dtype}
+    if HAS_PYARROW:
+        read_kwargs['engine'] = 'pyarrow'
+    else:
+        read_kwargs['float_precision'] = FLOAT_PRECISION
+    df = pd.read_csv(file_path, **read_kwargs)
+
+    if downcast:
+        df = downcast_frame(df, schema)
+
+    if use_binary_cache:
+        _write_binary_cache(df, file_path, cache_format, signature, cache_dir)
+
+    return df
+
+
+def iter_csv_chunks(file_path, chunksize, dtype=None):
+    """Stream a CSV in chunks, parsing numbers to exactly the values ``read_csv_fast`` gives.
+
+    The Arrow engine cannot stream, so this uses the C parser with round-trip
+    float parsing; rows scored chunk by chunk then match the rows trained on.
+    """
+    return pd.read_csv(file_path, chunksize=chunksize, dtype=dtype, float_precision=FLOAT_PRECISION)
@@ -1,4 +1,3 @@
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -6,18 +5,109 @@ import json
 import sys
 import warnings
 
+from data_ingestion import INGESTION_CACHE_DIR, read_csv_fast
+
 warnings.filterwarnings("ignore")  # Suppress seaborn/matplotlib warnings
 
+# Above this many numeric columns the p x p correlation matrix is not built in pandas
+WIDE_TABLE_COLUMNS = 2000
+
+
+def find_high_correlation_pairs(correlation_matrix, threshold=0.8):
+    """Extract feature pairs above the threshold from the upper triangle of a correlation matrix"""
+    values = correlation_matrix.to_numpy(dtype=float)
+    columns = correlation_matrix.columns
+    
+    # NaN compares False, so constant columns never produce a pair
+    mask = np.triu(np.abs(values) > threshold, k=1)
+    rows, cols = np.nonzero(mask)
+    
+    return [
+        {
+            'feature1': columns[i],
+            'feature2': columns[j],
+            'correlation': float(values[i, j])
+        }
+        for i, j in zip(rows, cols)
+    ]
+
+
+def blockwise_high_correlation_pairs(data, threshold=0.8, top_k=None, block_size=512):
+    """Find highly correlated column pairs without materializing the full correlation matrix.
+    
+    Columns are standardized once and correlated block by block, so memory stays at
+    O(n * p + block_size²). Missing values are mean-imputed, which can differ slightly
+    from the pairwise-complete ``DataFrame.corr`` on sparse data. Returns pairs sorted
+    by absolute correlation, limited to ``top_k`` when given.
+    """
+    if top_k is not None and top_k < 0:
+        raise ValueError(f"top_k must be non-negative, got {top_k}")
+    columns = data.columns
+    values = data.to_numpy(dtype=np.float64)
+    n_rows, n_cols = values.shape
+    if n_rows < 2 or n_cols < 2 or top_k == 0:
+        return []
+    
+    means = np.nanmean(values, axis=0)
+    centered = values - means
+    centered[np.isnan(centered)] = 0.0
+    norms = np.sqrt((centered ** 2).sum(axis=0))
+    valid = norms > 0
+    z = np.zeros_like(centered)
+    z[:, valid] = centered[:, valid] / norms[valid]
+    
+    pair_rows, pair_cols, pair_corrs = [], [], []
+    kept = 0
+    for start_i in range(0, n_cols, block_size):
+        block_i = z[:, start_i:start_i + block_size]
+        for start_j in range(start_i, n_cols, block_size):
+            block_j = z[:, start_j:start_j + block_size]
+            corr = block_i.T @ block_j
+            hits = np.abs(corr) > threshold
+            if start_i == start_j:
+                hits = np.triu(hits, k=1)
+            rows, cols = np.nonzero(hits)
+            if len(rows) == 0:
+                continue
+            pair_rows.append(rows + start_i)
+            pair_cols.append(cols + start_j)
+            pair_corrs.append(corr[rows, cols])
+            kept += len(rows)
+        
+        # Trim candidates after each row band so top-k memory stays bounded
+        if top_k is not None and kept > top_k:
+            rows, cols, corrs = (np.concatenate(a) for a in (pair_rows, pair_cols, pair_corrs))
+            keep = np.argpartition(-np.abs(corrs), top_k - 1)[:top_k]
+            pair_rows, pair_cols, pair_corrs = [rows[keep]], [cols[keep]], [corrs[keep]]
+            kept = top_k
+    
+    if not pair_corrs:
+        return []
+    
+    rows, cols, corrs = (np.concatenate(a) for a in (pair_rows, pair_cols, pair_corrs))
+    order = np.argsort(-np.abs(corrs), kind='stable')
+    if top_k is not None:
+        order = order[:top_k]
+    
+    return [
+        {
+            'feature1': columns[rows[k]],
+            'feature2': columns[cols[k]],
+            'correlation': float(np.clip(corrs[k], -1.0, 1.0))
+        }
+        for k in order
+    ]
+
 class DataProcessor:
     def __init__(self):
         self.data = None
         self.numeric_columns = []
         self.categorical_columns = []
         
-    def load_data(self, file_path):
+    def load_data(self, file_path, cache_format=None, downcast=False, cache_dir=INGESTION_CACHE_DIR):
         """Load data from CSV file"""
         try:
-            self.data = pd.read_csv(file_path)
+            self.data = read_csv_fast(file_path, cache_format=cache_format, downcast=downcast, cache_dir=cache_dir)
             self._identify_column_types()
             print(f"✅ Data loaded successfully: {self.data.shape}")
             return True
@@ -28,7 +118,7 @@ class DataProcessor:
     def _identify_column_types(self):
         """Identify numeric and categorical columns"""
         self.numeric_columns = self.data.select_dtypes(include=[np.number]).columns.tolist()
-        self.categorical_columns = self.data.select_dtypes(include=['object']).columns.tolist()
+        self.categorical_columns = self.data.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
     
     def generate_statistics(self):
         """Generate comprehensive statistics"""
@@ -133,7 +223,7 @@ class DataProcessor:
         
         return outliers_report
     
-    def generate_insights(self):
+    def generate_insights(self, correlation_threshold=0.8, max_correlation_pairs=None):
         """Generate data insights and recommendations"""
         insights = {
             'data_quality': {},
@@ -151,17 +241,17 @@ class DataProcessor:
         
         # Correlations
         if len(self.numeric_columns) > 1:
-            correlation_matrix = self.data[self.numeric_columns].corr()
-            high_corr_pairs = []
-            for i in range(len(correlation_matrix.columns)):
-                for j in range(i+1, len(correlation_matrix.columns)):
-                    corr_val = correlation_matrix.iloc[i, j]
-                    if abs(corr_val) > 0.8:
-                        high_corr_pairs.append({
-                            'feature1': correlation_matrix.columns[i],
-                            'feature2': correlation_matrix.columns[j],
-                            'correlation': float(corr_val)
-                        })
+            if len(self.numeric_columns) > WIDE_TABLE_COLUMNS:
+                high_corr_pairs = blockwise_high_correlation_pairs(
+                    self.data[self.numeric_columns],
+                    threshold=correlation_threshold,
+                    top_k=max_correlation_pairs
+                )
+            else:
+                correlation_matrix = self.data[self.numeric_columns].corr()
+                high_corr_pairs = find_high_correlation_pairs(correlation_matrix, correlation_threshold)
+                if max_correlation_pairs is not None:
+                    high_corr_pairs = sorted(high_corr_pairs, key=lambda p: -abs(p['correlation']))[:max_correlation_pairs]
             
             if high_corr_pairs:
                 insights['patterns'].append({'type': 'high_correlation', 'pairs': high_corr_pairs})
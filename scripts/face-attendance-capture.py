@@ -4,6 +4,10 @@ import os, cv2, csv, time, datetime
 import pandas as pd
 from PIL import ImageTk, Image
 
+from attendance_session import SessionPolicy, TrackFusion, load_roster, load_thresholds, recognize_faces
+from frame_preview import FramePreview
+from loop_metrics import session_metrics
+
 haarcasecade_path = "haarcascade_frontalface_default.xml"
 trainimagelabel_path = "TrainingImageLabel\\Trainner.yml"
 trainimage_path = "TrainingImage"
@@ -14,8 +18,6 @@ attendance_path = "Attendance"
 def subjectChoose(text_to_speech):
     def FillAttendance():
         sub = tx.get()
-        now = time.time()
-        future = now + 20
 
         if sub == "":
             t = "Please enter the subject name!!!"
@@ -37,48 +39,54 @@ def subjectChoose(text_to_speech):
             facecasCade = cv2.CascadeClassifier(haarcasecade_path)
             df = pd.read_csv(studentdetail_path)
             cam = cv2.VideoCapture(0)
-            font = cv2.FONT_HERSHEY_SIMPLEX
 
             col_names = ["Enrollment", "Name", "Date", "Time", "Attendance"]
             attendance = pd.DataFrame(columns=col_names)
 
-            while True:
-                _, im = cam.read()
-                gray = cv2.cvtColor(im, cv2.COLOR_BGR2GRAY)
-                faces = facecasCade.detectMultiScale(gray, 1.2, 5)
-                for (x, y, w, h) in faces:
-                    Id, conf = recognizer.predict(gray[y:y + h, x:x + w])
-                    if conf < 70:
-                        ts = time.time()
-                        date = datetime.datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
-                        timeStamp = datetime.datetime.fromtimestamp(ts).strftime("%H:%M:%S")
-                        name = df.loc[df["Enrollment"] == Id]["Name"].values[0]
-
-                        attendance.loc[len(attendance)] = [Id, name, date, timeStamp, "P"]
-
-                        cv2.rectangle(im, (x, y), (x + w, y + h), (0, 260, 0), 4)
-                        cv2.putText(im, f"{Id}-{name}", (x + h, y), font, 1, (255, 255, 0), 4)
-                    else:
-                        cv2.rectangle(im, (x, y), (x + w, y + h), (0, 25, 255), 7)
-                        cv2.putText(im, "Unknown", (x + h, y), font, 1, (0, 25, 255), 4)
-
-                if time.time() > future:
-                    break
-
-                attendance = attendance.drop_duplicates(["Enrollment"], keep="first")
-                cv2.imshow("Filling Attendance...", im)
-                key = cv2.waitKey(30) & 0xFF
-                if key == 27:
-                    break
-
-            # Save attendance
-            ts = time.time()
-            date = datetime.datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
-            timeStamp = datetime.datetime.fromtimestamp(ts).strftime("%H-%M-%S")
-            path = os.path.join(attendance_path, sub)
-            os.makedirs(path, exist_ok=True)
-            fileName = f"{path}/{sub}_{date}_{timeStamp}.csv"
-            attendance.to_csv(fileName, index=False)
+            policy = SessionPolicy(load_roster(sub))
+            fusion = TrackFusion(load_thresholds(trainimagelabel_path))
+            with session_metrics("fill_attendance") as metrics, FramePreview("Filling Attendance...", metrics=metrics) as preview:
+                while True:
+                    with metrics.stage("grab"):
+                        _, im = cam.read()
+                    with metrics.stage("convert"):
+                        gray = cv2.cvtColor(im, cv2.COLOR_BGR2GRAY)
+                    for (x, y, w, h, Id, conf, accepted) in fusion.update(recognize_faces(gray, facecasCade, recognizer, metrics=metrics)):
+                        if accepted:
+                            policy.observe(Id, conf)
+                            ts = time.time()
+                            date = datetime.datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+                            timeStamp = datetime.datetime.fromtimestamp(ts).strftime("%H:%M:%S")
+                            name = df.loc[df["Enrollment"] == Id]["Name"].values[0]
+
+                            with metrics.stage("write"):
+                                attendance.loc[len(attendance)] = [Id, name, date, timeStamp, "P"]
+
+                            preview.annotate(x, y, w, h, f"{Id}-{name}", (0, 260, 0), (255, 255, 0),
+                                             text_thickness=4, text_at=(x + h, y))
+                        else:
+                            preview.annotate(x, y, w, h, "Unknown", (0, 25, 255), box_thickness=7,
+                                             text_thickness=4, text_at=(x + h, y))
+
+                    if policy.should_stop():
+                        break
+
+                    with metrics.stage("write"):
+                        attendance = attendance.drop_duplicates(["Enrollment"], keep="first")
+                    key = preview.show(im) & 0xFF
+                    metrics.frame_done()
+                    if key == 27:
+                        break
+
+                # Save attendance
+                ts = time.time()
+                date = datetime.datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+                timeStamp = datetime.datetime.fromtimestamp(ts).strftime("%H-%M-%S")
+                path = os.path.join(attendance_path, sub)
+                os.makedirs(path, exist_ok=True)
+                fileName = f"{path}/{sub}_{date}_{timeStamp}.csv"
+                with metrics.stage("write"):
+                    attendance.to_csv(fileName, index=False)
 
             m = f"Attendance Filled Successfully for {sub}"
             Notifica.configure(text=m, bg="black", fg="yellow", width=33,
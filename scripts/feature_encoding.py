@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+ENCODING_MODES = ('dense', 'sparse', 'hashing', 'target')
+MISSING_CATEGORY = '__missing__'
+
+
+class SparseFeatureEncoder:
+    """Memory-efficient feature encoding that produces float32 CSR matrices.
+
+    Numeric columns are standardized, categorical columns with at most
+    ``max_onehot_levels`` distinct values are one-hot encoded sparsely, and the
+    remaining high-cardinality columns depend on ``mode``:
+
+    - 'sparse': one-hot as well (every level becomes a sparse column)
+    - 'hashing': hashed into ``n_hash_features`` shared sparse columns
+    - 'target': replaced by smoothed per-class target frequencies; training rows
+      are encoded out-of-fold so a row never sees its own label
+    """
+
+    def __init__(self, mode='hashing', max_onehot_levels=50, n_hash_features=2 ** 12,
+                 smoothing=10.0, n_folds=5, random_state=42):
+        if mode not in ENCODING_MODES or mode == 'dense':
+            raise ValueError(f"mode must be one of {ENCODING_MODES[1:]}, got {mode!r}")
+        self.mode = mode
+        self.max_onehot_levels = max_onehot_levels
+        self.n_hash_features = n_hash_features
+        self.smoothing = smoothing
+        self.n_folds = n_folds
+        self.random_state = random_state
+
+    @staticmethod
+    def _as_strings(series):
+        return series.astype(object).where(series.notna(), MISSING_CATEGORY).astype(str)
+
+    def _split_columns(self, X):
+        self.numeric_columns = X.select_dtypes(include=[np.number, 'bool']).columns.tolist()
+        self.categorical_columns = [col for col in X.columns if col not in self.numeric_columns]
+
+        if self.mode == 'sparse':
+            self.onehot_columns = list(self.categorical_columns)
+            self.high_cardinality_columns = []
+        else:
+            self.onehot_columns = [col for col in self.categorical_columns
+                                   if X[col].nunique(dropna=False) <= self.max_onehot_levels]
+            self.high_cardinality_columns = [col for col in self.categorical_columns
+                                             if col not in self.onehot_columns]
+
+    def _target_table(self, values, y_idx):
+        """Smoothed P(class | category) for every category, dropping the first class column"""
+        counts = pd.crosstab(values, y_idx).reindex(columns=range(self.n_classes_), fill_value=0)
+        totals = counts.sum(axis=1).to_numpy()[:, None]
+        table = (counts.to_numpy() + self.smoothing * self.class_prior_) / (totals + self.smoothing)
+        return pd.DataFrame(table[:, 1:], index=counts.index, dtype=np.float32)
+
+    def _apply_target_table(self, table, values):
+        encoded = table.reindex(values.to_numpy()).to_numpy(dtype=np.float32, copy=True)
+        missing = np.isnan(encoded).any(axis=1)
+        encoded[missing] = self.class_prior_[1:]
+        return encoded
+
+    def _hash_block(self, X):
+        rows = ([f"{col}={value}" for col, value in zip(self.high_cardinality_columns, row)]
+                for row in zip(*(self._as_strings(X[col]) for col in self.high_cardinality_columns)))
+        return self.hasher_.transform(rows).astype(np.float32)
+
+    def _blocks(self, X, target_block=None):
+        blocks = []
+        if self.numeric_columns:
+            numeric = self.scaler_.transform(X[self.numeric_columns].astype(np.float64))
+            blocks.append(sp.csr_matrix(numeric.astype(np.float32)))
+        if self.onehot_columns:
+            onehot_input = pd.DataFrame({col: self._as_strings(X[col]) for col in self.onehot_columns})
+            blocks.append(self.onehot_.transform(onehot_input).astype(np.float32))
+        if self.high_cardinality_columns:
+            if self.mode == 'hashing':
+                blocks.append(self._hash_block(X))
+            else:
+                if target_block is None:
+                    target_block = np.hstack([
+                        self._apply_target_table(self.target_tables_[col], self._as_strings(X[col]))
+                        for col in self.high_cardinality_columns
+                    ])
+                blocks.append(sp.csr_matrix(target_block))
+        return sp.hstack(blocks, format='csr', dtype=np.float32)
+
+    def fit_transform(self, X, y):
+        """Fit on training rows and return their encoding; ``y`` must be class labels"""
+        self._split_columns(X)
+        y = np.asarray(y)
+
+        self.scaler_ = StandardScaler()
+        if self.numeric_columns:
+            self.scaler_.fit(X[self.numeric_columns].astype(np.float64))
+
+        if self.onehot_columns:
+            self.onehot_ = OneHotEncoder(handle_unknown='ignore', dtype=np.float32)
+            self.onehot_.fit(pd.DataFrame({col: self._as_strings(X[col]) for col in self.onehot_columns}))
+
+        target_block = None
+        if self.high_cardinality_columns and self.mode == 'hashing':
+            self.hasher_ = FeatureHasher(n_features=self.n_hash_features, input_type='string',
+                                         alternate_sign=False)
+        elif self.high_cardinality_columns:
+            self.classes_, y_idx = np.unique(y, return_inverse=True)
+            self.n_classes_ = len(self.classes_)
+            self.class_prior_ = np.bincount(y_idx, minlength=self.n_classes_) / len(y_idx)
+
+            columns = {col: self._as_strings(X[col]).reset_index(drop=True) for col in self.high_cardinality_columns}
+            self.target_tables_ = {col: self._target_table(values, y_idx) for col, values in columns.items()}
+
+            # Out-of-fold encoding for the training rows themselves
+            target_block = np.zeros((len(y_idx), len(columns) * (self.n_classes_ - 1)), dtype=np.float32)
+            folds = StratifiedKFold(n_splits=self.n_folds, shuffle=True, random_state=self.random_state)
+            for fit_idx, enc_idx in folds.split(np.zeros(len(y_idx)), y_idx):
+                encoded = [
+                    self._apply_target_table(self._target_table(values.iloc[fit_idx], y_idx[fit_idx]),
+                                             values.iloc[enc_idx])
+                    for values in columns.values()
+                ]
+                target_block[enc_idx] = np.hstack(encoded)
+
+        return self._blocks(X, target_block)
+
+    def transform(self, X):
+        return self._blocks(X)
+
+    def get_feature_names(self):
+        names = list(self.numeric_columns)
+        if self.onehot_columns:
+            for col, categories in zip(self.onehot_columns, self.onehot_.categories_):
+                names.extend(f"{col}_{category}" for category in categories)
+        if self.high_cardinality_columns and self.mode == 'hashing':
+            names.extend(f"hash_{i}" for i in range(self.n_hash_features))
+        elif self.high_cardinality_columns:
+            for col in self.high_cardinality_columns:
+                names.extend(f"{col}_target_{cls}" for cls in self.classes_[1:])
+        return names
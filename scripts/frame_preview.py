@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+
+import cv2
+
+# How the attendance loops show the camera feed:
+#   full    - annotate and show every frame on the loop thread (waitKey paces the loop)
+#   preview - a background thread downscales and annotates frames; the loop thread shows
+#             the latest one at PREVIEW_FPS (HighGUI calls must stay on one thread)
+#   off     - headless; no drawing or display, the loop runs as fast as detection allows
+DISPLAY_MODES = ('full', 'preview', 'off')
+display_mode = os.environ.get("ATTENDANCE_DISPLAY", "full")
+PREVIEW_FPS = 5
+PREVIEW_SCALE = 0.5
+FULL_DISPLAY_DELAY = 30  # ms passed to cv2.waitKey in full mode
+PREVIEW_DISPLAY_DELAY = 1  # ms passed to cv2.waitKey when a preview frame is shown
+
+font = cv2.FONT_HERSHEY_SIMPLEX
+
+
+def draw_annotations(frame, annotations, scale=1.0):
+    for (x, y, w, h, text, color, text_color, box_thickness, text_thickness, text_at) in annotations:
+        x, y, w, h = (int(v * scale) for v in (x, y, w, h))
+        tx, ty = (int(v * scale) for v in text_at)
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, max(int(box_thickness * scale), 1))
+        cv2.putText(frame, text, (tx, ty), font, scale, text_color, max(int(text_thickness * scale), 1))
+    return frame
+
+
+class FramePreview:
+    """Optional on-screen view of a recognition loop.
+
+    Collect boxes with ``annotate`` while processing a frame, then call
+    ``show(frame)``; it returns the last key pressed (-1 if none), so ESC
+    handling stays in the loop. In ``preview`` mode resizing and drawing
+    happen on a daemon thread; ``show`` hands the frame over and, at most
+    ``fps`` times a second, displays the latest finished preview. imshow and
+    waitKey always run on the caller's thread, since HighGUI is not
+    thread-safe (and must run on the main thread on macOS). Draw/display time
+    is recorded on ``metrics`` when given.
+    """
+
+    def __init__(self, window_name, mode=None, fps=PREVIEW_FPS, scale=PREVIEW_SCALE, metrics=None):
+        self.window_name = window_name
+        self.mode = mode or display_mode
+        if self.mode not in DISPLAY_MODES:
+            raise ValueError(f"Unknown display mode '{self.mode}'. Use one of {DISPLAY_MODES}")
+        self.fps = fps
+        self.scale = scale
+        self.metrics = metrics
+        self.annotations = []
+        self._latest = None
+        self._ready = None
+        self._last_display = 0.0
+        self._lock = threading.Lock()
+        self._pending = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        if self.mode == 'preview':
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def annotate(self, x, y, w, h, text, color, text_color=None, box_thickness=4, text_thickness=2,
+                 text_at=None):
+        """Queue a box and label for the next ``show``; the label defaults to just above the box"""
+        if self.mode != 'off':
+            self.annotations.append((x, y, w, h, text, color, text_color or color, box_thickness,
+                                     text_thickness, text_at or (x, y - 10)))
+
+    def show(self, frame):
+        annotations, self.annotations = self.annotations, []
+        if self.mode == 'off':
+            return -1
+        if self.mode == 'preview':
+            with self._lock:
+                self._latest = (frame, annotations)
+            self._pending.set()
+            now = time.perf_counter()
+            if now - self._last_display < 1.0 / self.fps:
+                return -1
+            self._last_display = now
+            with self._lock:
+                ready, self._ready = self._ready, None
+            start = time.perf_counter()
+            if ready is not None:
+                cv2.imshow(self.window_name, ready)
+            # Also keeps the window responsive; keys pressed in between are queued by HighGUI
+            key = cv2.waitKey(PREVIEW_DISPLAY_DELAY)
+            self._observe('display', start)
+            return key
+
+        start = time.perf_counter()
+        draw_annotations(frame, annotations)
+        self._observe('draw', start)
+        start = time.perf_counter()
+        cv2.imshow(self.window_name, frame)
+        key = cv2.waitKey(FULL_DISPLAY_DELAY)
+        self._observe('display', start)
+        return key
+
+    def close(self):
+        self._stop.set()
+        self._pending.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _observe(self, stage, start):
+        if self.metrics is not None:
+            self.metrics.observe(stage, time.perf_counter() - start)
+
+    def _run(self):
+        interval = 1.0 / self.fps
+        while not self._stop.is_set():
+            self._pending.wait()
+            self._pending.clear()
+            with self._lock:
+                latest, self._latest = self._latest, None
+            if latest is None:
+                continue
+            frame, annotations = latest
+            start = time.perf_counter()
+            small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+            draw_annotations(small, annotations, self.scale)
+            self._observe('draw', start)
+            with self._lock:
+                self._ready = small
+            # No point preparing frames faster than they are shown
+            self._stop.wait(max(interval - (time.perf_counter() - start), 0))
@@ -1,31 +1,186 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, VotingClassifier
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
 from sklearn.svm import SVC
 from sklearn.neural_network import MLPClassifier
-from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.model_selection import train_test_split, StratifiedKFold
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
+from scipy.optimize import minimize
+from scipy.stats import loguniform
+import scipy.sparse as sp
 import matplotlib.pyplot as plt
 import seaborn as sns
+from joblib import Parallel, delayed
+import joblib
+import argparse
 import json
-import sys
+import os
+import re
+import time
 import warnings
+
+from boosting import BOOSTING_BACKENDS, make_gradient_boosting
+from data_ingestion import INGESTION_CACHE_DIR, iter_csv_chunks, read_csv_fast
+from feature_encoding import ENCODING_MODES, SparseFeatureEncoder
+from model_tuning import DEFAULT_CACHE_DIR, successive_halving_search
+
 warnings.filterwarnings('ignore')
 
+CV_FOLDS = 5
+ENSEMBLE_NAME = 'Hybrid Ensemble'
+PIPELINE_METADATA = 'pipeline.json'
+PREDICT_CHUNK_ROWS = 100000
+
+# Estimators that cannot consume scipy.sparse input; they receive a dense float32 copy
+DENSE_ONLY_ESTIMATORS = (HistGradientBoostingClassifier,)
+
+
+def _model_input(model, X):
+    """Route sparse matrices to sparse-capable models and densify only for the others"""
+    if sp.issparse(X) and isinstance(model, DENSE_ONLY_ESTIMATORS):
+        return X.toarray().astype(np.float32, copy=False)
+    return X
+
+
+def _available_cores(n_jobs=None):
+    return n_jobs if n_jobs and n_jobs > 0 else (os.cpu_count() or 1)
+
+
+def _fit_fold(model, X, y, train_idx, test_idx):
+    """Fit a fresh single-threaded clone on one CV fold and return its held-out predictions"""
+    fold_model = clone(model)
+    if 'n_jobs' in fold_model.get_params():
+        # Folds already run one per thread of the model's budget
+        fold_model.set_params(n_jobs=1)
+    fold_model.fit(X[train_idx], y[train_idx])
+    return test_idx, fold_model.classes_, fold_model.predict(X[test_idx]), fold_model.predict_proba(X[test_idx])
+
+
+def _fit_and_evaluate(name, model, X_train, y_train, X_test, y_test, n_jobs):
+    """Fit one model, score it and cross-validate it, timing the whole unit of work.
+
+    CV folds run on threads inside the calling process so ``time.process_time``
+    covers every core the model used, whether this runs in a worker or in-process.
+    The out-of-fold class probabilities are returned for ensemble weighting, and
+    the train/test predictions for the engine's prediction cache. ``n_jobs`` is
+    the model's core budget: the full fit uses it for the estimator's own
+    threads, the CV folds as single-threaded fits on that many threads.
+    """
+    warnings.filterwarnings('ignore')  # loky workers do not inherit the module-level filter
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    X_train, X_test = _model_input(model, X_train), _model_input(model, X_test)
+    
+    configured_n_jobs = model.get_params().get('n_jobs')
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=n_jobs)
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - wall_start
+    
+    predictions = {
+        'train': {'pred': model.predict(X_train)},
+        'test': {'pred': model.predict(X_test), 'proba': model.predict_proba(X_test)}
+    }
+    train_accuracy = accuracy_score(y_train, predictions['train']['pred'])
+    test_accuracy = accuracy_score(y_test, predictions['test']['pred'])
+    
+    # Same folds as cross_val_score(cv=5), but keeping the held-out probabilities
+    cv_start = time.perf_counter()
+    X_cv = X_train if sp.issparse(X_train) else np.asarray(X_train)
+    y_cv = np.asarray(y_train)
+    classes = np.unique(y_cv)
+    folds = StratifiedKFold(n_splits=CV_FOLDS).split(X_cv, y_cv)
+    fold_outputs = Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(_fit_fold)(model, X_cv, y_cv, train_idx, test_idx) for train_idx, test_idx in folds
+    )
+    
+    oof_proba = np.zeros((len(y_cv), len(classes)))
+    cv_scores = []
+    for test_idx, fold_classes, fold_pred, fold_proba in fold_outputs:
+        oof_proba[np.ix_(test_idx, np.searchsorted(classes, fold_classes))] = fold_proba
+        cv_scores.append(accuracy_score(y_cv[test_idx], fold_pred))
+    cv_scores = np.array(cv_scores)
+    cv_time = time.perf_counter() - cv_start
+    
+    # The training budget is not the model's setting; do not persist it
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=configured_n_jobs)
+    
+    return name, model, {
+        'train_accuracy': float(train_accuracy),
+        'test_accuracy': float(test_accuracy),
+        'cv_mean': float(cv_scores.mean()),
+        'cv_std': float(cv_scores.std()),
+        'wall_time': time.perf_counter() - wall_start,
+        'cpu_time': time.process_time() - cpu_start,
+        'fit_time': fit_time,
+        'cv_time': cv_time,
+        'n_jobs': n_jobs
+    }, oof_proba, predictions
+
+
+class PrefitSoftVotingEnsemble:
+    """Soft-voting ensemble over already fitted models.
+    
+    Unlike ``VotingClassifier`` nothing is cloned or refitted: the class
+    probabilities of the stored models are averaged with optional weights.
+    """
+    
+    def __init__(self, models, weights=None):
+        self.models = dict(models)
+        self.weights = dict(weights) if weights else {name: 1.0 for name in self.models}
+        self.classes_ = next(iter(self.models.values())).classes_
+    
+    def combine_probabilities(self, member_probas):
+        """Weighted average of per-model probabilities, given as a name -> array mapping"""
+        total_weight = sum(self.weights.values())
+        proba = None
+        for name in self.models:
+            weight = self.weights.get(name, 0.0)
+            if weight > 0:
+                weighted = weight * member_probas[name]
+                proba = weighted if proba is None else proba + weighted
+        return proba / total_weight
+    
+    def predict_proba(self, X):
+        return self.combine_probabilities({
+            name: model.predict_proba(_model_input(model, X))
+            for name, model in self.models.items()
+            if self.weights.get(name, 0.0) > 0
+        })
+    
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
 class HybridMLEngine:
-    def __init__(self):
+    def __init__(self, boosting='exact', early_stopping=False):
+        self.boosting = boosting
+        self.early_stopping = early_stopping
         self.models = {}
         self.ensemble_model = None
         self.scaler = StandardScaler()
         self.label_encoder = LabelEncoder()
         self.feature_names = []
+        self.raw_feature_columns = []
+        self.categorical_features = []
+        self.target_encoded = False
+        self.encoding = 'dense'
+        self.feature_encoder = None
         self.target_name = ""
+        self.model_timings = {}
+        self.tuned_params = {}
+        self.tuning_results = {}
+        self.oof_probabilities = {}
+        self.ensemble_weights = {}
+        self._prediction_cache = {}
         
-    def load_dataset(self, file_path):
+    def load_dataset(self, file_path, cache_format=None, downcast=False, cache_dir=INGESTION_CACHE_DIR):
         """Load dataset from CSV file"""
         try:
-            self.data = pd.read_csv(file_path)
+            self.data = read_csv_fast(file_path, cache_format=cache_format, downcast=downcast, cache_dir=cache_dir)
             print(f"Dataset loaded successfully: {self.data.shape}")
             print(f"Columns: {list(self.data.columns)}")
             return True
@@ -33,101 +188,296 @@ class HybridMLEngine:
             print(f"Error loading dataset: {e}")
             return False
     
-    def prepare_data(self, target_column):
-        """Prepare data for machine learning"""
+    def prepare_data(self, target_column, encoding='dense'):
+        """Prepare data for machine learning
+        
+        ``encoding='dense'`` one-hot encodes with ``get_dummies``. The 'sparse',
+        'hashing' and 'target' modes build float32 CSR matrices with
+        ``SparseFeatureEncoder``, fitted on the training split only.
+        """
         try:
             self.target_name = target_column
-            self.feature_names = [col for col in self.data.columns if col != target_column]
+            self.raw_feature_columns = [col for col in self.data.columns if col != target_column]
             
-            X = self.data[self.feature_names]
+            X = self.data[self.raw_feature_columns]
             y = self.data[target_column]
             
-            # Handle categorical features
-            X_processed = pd.get_dummies(X, drop_first=True)
-            self.feature_names = list(X_processed.columns)
-            
             # Encode target if categorical
-            if y.dtype == 'object':
+            self.target_encoded = not pd.api.types.is_numeric_dtype(y)
+            if self.target_encoded:
                 y = self.label_encoder.fit_transform(y)
             
-            # Scale features
-            X_scaled = self.scaler.fit_transform(X_processed)
-            
-            self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(
-                X_scaled, y, test_size=0.3, random_state=42, stratify=y
-            )
+            self._prediction_cache.clear()
+            self.encoding = encoding
+            if encoding == 'dense':
+                self.feature_encoder = None
+                
+                # Handle categorical features
+                X_processed = self._encode_features(X, fit=True)
+                
+                # Scale features
+                X_scaled = self.scaler.fit_transform(X_processed)
+                
+                self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(
+                    X_scaled, y, test_size=0.3, random_state=42, stratify=y
+                )
+            else:
+                # Split first so the encoder (and any target statistics) only sees training rows
+                y = np.asarray(y)
+                train_idx, test_idx = train_test_split(
+                    np.arange(len(y)), test_size=0.3, random_state=42, stratify=y
+                )
+                self.feature_encoder = SparseFeatureEncoder(mode=encoding)
+                self.X_train = self.feature_encoder.fit_transform(X.iloc[train_idx], y[train_idx])
+                self.X_test = self.feature_encoder.transform(X.iloc[test_idx])
+                self.y_train, self.y_test = y[train_idx], y[test_idx]
+                self.feature_names = self.feature_encoder.get_feature_names()
+                self.categorical_features = self.feature_encoder.categorical_columns
             
             print(f"Data prepared: {len(self.feature_names)} features, {len(np.unique(y))} classes")
-            print(f"Training set: {len(self.X_train)} samples, Test set: {len(self.X_test)} samples")
+            print(f"Training set: {self.X_train.shape[0]} samples, Test set: {self.X_test.shape[0]} samples")
             return True
             
         except Exception as e:
             print(f"Error preparing data: {e}")
             return False
     
-    def train_individual_models(self):
-        """Train individual ML models"""
-        models_config = {
+    def _encode_features(self, X, fit=False):
+        """One-hot encode categorical features, aligning new data to the training column layout"""
+        if fit:
+            self.categorical_features = X.select_dtypes(exclude=[np.number, 'bool']).columns.tolist()
+            X_processed = pd.get_dummies(X, drop_first=True)
+            self.feature_names = list(X_processed.columns)
+            return X_processed
+        
+        # Without drop_first the dropped baseline level is just discarded by the reindex,
+        # even when a chunk happens not to contain it
+        return pd.get_dummies(X, columns=self.categorical_features).reindex(columns=self.feature_names, fill_value=0)
+    
+    def _build_models(self):
+        """Instantiate the unfitted base models of the ensemble, applying any tuned hyperparameters"""
+        models = {
             'Random Forest': RandomForestClassifier(n_estimators=100, random_state=42),
             'SVM': SVC(probability=True, random_state=42),
-            'Gradient Boosting': GradientBoostingClassifier(random_state=42),
+            'Gradient Boosting': make_gradient_boosting(
+                'classification', backend=self.boosting, early_stopping=self.early_stopping
+            ),
             'Neural Network': MLPClassifier(hidden_layer_sizes=(100,50), max_iter=1000, random_state=42)
         }
+        for name, params in self.tuned_params.items():
+            if name in models:
+                models[name].set_params(**params)
+        return models
+    
+    def _param_spaces(self):
+        """Search spaces for tune_hyperparameters, keyed like _build_models"""
+        if self.boosting == 'hist':
+            boosting_space = {
+                'max_iter': [100, 200, 400],
+                'learning_rate': loguniform(0.01, 0.3),
+                'max_depth': [3, 4, 6, 8],
+                'l2_regularization': loguniform(1e-4, 1.0)
+            }
+        else:
+            boosting_space = {
+                'n_estimators': [100, 200, 300],
+                'learning_rate': loguniform(0.01, 0.3),
+                'max_depth': [2, 3, 4, 6],
+                'subsample': [0.7, 0.85, 1.0]
+            }
+        return {
+            'Random Forest': {
+                'n_estimators': [100, 200, 400],
+                'max_depth': [None, 10, 20, 30],
+                'min_samples_leaf': [1, 2, 4],
+                'max_features': ['sqrt', 'log2', 0.5]
+            },
+            'SVM': {
+                'C': loguniform(1e-2, 1e2),
+                'gamma': ['scale', 'auto'],
+                'kernel': ['rbf', 'linear']
+            },
+            'Gradient Boosting': boosting_space,
+            'Neural Network': {
+                'hidden_layer_sizes': [(64,), (100, 50), (128, 64), (256, 128)],
+                'alpha': loguniform(1e-5, 1e-2),
+                'learning_rate_init': loguniform(1e-4, 1e-2)
+            }
+        }
+    
+    def tune_hyperparameters(self, n_candidates=27, factor=3, cv=3, n_jobs=None,
+                             cache_dir=DEFAULT_CACHE_DIR, model_names=None):
+        """Tune each model with successive halving; the best params are used by later training
+        
+        Fold scores are cached under ``cache_dir`` so an interrupted run resumes.
+        """
+        base_models = self._build_models()
+        spaces = self._param_spaces()
+        
+        for name in model_names or list(base_models):
+            model = base_models[name]
+            print(f"Tuning {name}...")
+            # SVC's Platt scaling does not change predict(), so skip its internal CV while searching
+            overrides = {'probability': False} if isinstance(model, SVC) else None
+            result = successive_halving_search(
+                model, spaces[name], _model_input(model, self.X_train), self.y_train,
+                n_candidates=n_candidates, factor=factor, cv=cv, n_jobs=n_jobs,
+                cache_dir=cache_dir, search_overrides=overrides
+            )
+            self.tuned_params[name] = result['best_params']
+            self.tuning_results[name] = result
+            print(f"{name} - best CV accuracy {result['best_score']:.4f} with {result['best_params']}")
+        
+        return self.tuned_params
+    
+    def _core_budgets(self, model_names, n_jobs=None, core_budgets=None):
+        """Split the available cores across models, honouring explicit per-model budgets"""
+        total_cores = _available_cores(n_jobs)
+        core_budgets = core_budgets or {}
+        
+        unassigned = [name for name in model_names if name not in core_budgets]
+        remaining = max(total_cores - sum(core_budgets.get(name, 0) for name in model_names), 0)
+        default_budget = max(remaining // max(len(unassigned), 1), 1)
+        
+        return {name: max(int(core_budgets.get(name, default_budget)), 1) for name in model_names}
+    
+    def train_individual_models(self, parallel=False, n_jobs=None, core_budgets=None):
+        """Train individual ML models
+        
+        With ``parallel=True`` every model is fitted and cross-validated in its own
+        worker process, at most one worker per core of ``n_jobs`` (default: all);
+        ``core_budgets`` maps model names to the cores each one may use and the
+        remaining cores are shared evenly.
+        """
+        models_config = self._build_models()
+        self._prediction_cache.clear()
+        
+        if parallel:
+            budgets = self._core_budgets(list(models_config), n_jobs, core_budgets)
+            print(f"Training {len(models_config)} models in parallel, core budgets: {budgets}")
+            n_workers = min(len(models_config), _available_cores(n_jobs))
+            outcomes = Parallel(n_jobs=n_workers, backend='loky')(
+                delayed(_fit_and_evaluate)(
+                    name, model, self.X_train, self.y_train, self.X_test, self.y_test, budgets[name]
+                )
+                for name, model in models_config.items()
+            )
+        else:
+            outcomes = []
+            for name, model in models_config.items():
+                print(f"Training {name}...")
+                outcomes.append(_fit_and_evaluate(
+                    name, model, self.X_train, self.y_train, self.X_test, self.y_test, n_jobs
+                ))
         
         results = {}
-        for name, model in models_config.items():
-            print(f"Training {name}...")
-            model.fit(self.X_train, self.y_train)
-            
-            train_pred = model.predict(self.X_train)
-            test_pred = model.predict(self.X_test)
-            
-            train_accuracy = accuracy_score(self.y_train, train_pred)
-            test_accuracy = accuracy_score(self.y_test, test_pred)
-            
-            cv_scores = cross_val_score(model, self.X_train, self.y_train, cv=5)
-            
-            results[name] = {
-                'model': model,
-                'train_accuracy': float(train_accuracy),
-                'test_accuracy': float(test_accuracy),
-                'cv_mean': float(cv_scores.mean()),
-                'cv_std': float(cv_scores.std())
-            }
+        for name, model, metrics, oof_proba, predictions in outcomes:
+            self.oof_probabilities[name] = oof_proba
+            for split, outputs in predictions.items():
+                self._prediction_cache[(name, split)] = outputs
+            results[name] = {'model': model, **metrics}
             self.models[name] = model
+            self.model_timings[name] = {
+                'wall_time': metrics['wall_time'],
+                'cpu_time': metrics['cpu_time'],
+                'fit_time': metrics['fit_time'],
+                'cv_time': metrics['cv_time'],
+                'n_jobs': metrics['n_jobs']
+            }
             
-            print(f"{name} - Test Accuracy: {test_accuracy:.4f}, CV: {cv_scores.mean():.4f} ± {cv_scores.std():.4f}")
+            print(f"{name} - Test Accuracy: {metrics['test_accuracy']:.4f}, "
+                  f"CV: {metrics['cv_mean']:.4f} ± {metrics['cv_std']:.4f}, "
+                  f"wall {metrics['wall_time']:.2f}s, CPU {metrics['cpu_time']:.2f}s")
         
         return results
     
-    def create_hybrid_ensemble(self):
-        """Create hybrid ensemble model"""
-        estimators = [
-            ('rf', self.models['Random Forest']),
-            ('svm', self.models['SVM']),
-            ('gb', self.models['Gradient Boosting']),
-            ('nn', self.models['Neural Network'])
-        ]
-        self.ensemble_model = VotingClassifier(estimators=estimators, voting='soft')
-        print("Training hybrid ensemble model...")
-        self.ensemble_model.fit(self.X_train, self.y_train)
-        
-        ensemble_pred = self.ensemble_model.predict(self.X_test)
+    def _learn_stacking_weights(self):
+        """Learn non-negative ensemble weights that minimise log-loss on the out-of-fold probabilities"""
+        names = list(self.models)
+        y_true = np.asarray(self.y_train)
+        classes = next(iter(self.models.values())).classes_
+        true_idx = np.searchsorted(classes, y_true)
+        stacked = np.stack([self.oof_probabilities[name] for name in names])
+        
+        def log_loss(weights):
+            proba = np.tensordot(weights, stacked, axes=1)
+            return -np.mean(np.log(np.clip(proba[np.arange(len(true_idx)), true_idx], 1e-15, 1.0)))
+        
+        start = np.full(len(names), 1.0 / len(names))
+        result = minimize(
+            log_loss, start, method='SLSQP',
+            bounds=[(0.0, 1.0)] * len(names),
+            constraints=({'type': 'eq', 'fun': lambda w: w.sum() - 1.0},)
+        )
+        weights = result.x if result.success else start
+        return {name: float(weight) for name, weight in zip(names, weights)}
+    
+    def create_hybrid_ensemble(self, stacking=False):
+        """Create hybrid ensemble model from the already fitted models
+        
+        With ``stacking=True`` the voting weights are learned from the out-of-fold
+        probabilities collected during cross-validation instead of being uniform.
+        """
+        if stacking and all(name in self.oof_probabilities for name in self.models):
+            self.ensemble_weights = self._learn_stacking_weights()
+            print("Stacking weights: " + ", ".join(f"{name}={w:.3f}" for name, w in self.ensemble_weights.items()))
+        else:
+            self.ensemble_weights = {name: 1.0 for name in self.models}
+        
+        self.ensemble_model = PrefitSoftVotingEnsemble(self.models, self.ensemble_weights)
+        
+        self._prediction_cache.pop((ENSEMBLE_NAME, 'train'), None)
+        self._prediction_cache.pop((ENSEMBLE_NAME, 'test'), None)
+        
+        ensemble_pred = self.get_predictions(ENSEMBLE_NAME)
         ensemble_accuracy = accuracy_score(self.y_test, ensemble_pred)
         print(f"Hybrid Ensemble Accuracy: {ensemble_accuracy:.4f}")
         return ensemble_accuracy
     
+    def _split_features(self, split):
+        if split == 'train':
+            return self.X_train
+        if split == 'test':
+            return self.X_test
+        raise ValueError(f"Unknown split: {split}")
+    
+    def _cached_outputs(self, name, split, need_proba):
+        """Fill the cache entry for a model/split pair once and return it"""
+        outputs = self._prediction_cache.setdefault((name, split), {})
+        
+        if name == ENSEMBLE_NAME:
+            # Combine the members' cached probabilities instead of re-running every model
+            if 'proba' not in outputs:
+                outputs['proba'] = self.ensemble_model.combine_probabilities({
+                    member: self.get_probabilities(member, split) for member in self.models
+                })
+            if 'pred' not in outputs:
+                outputs['pred'] = self.ensemble_model.classes_[np.argmax(outputs['proba'], axis=1)]
+            return outputs
+        
+        model = self.models[name]
+        if need_proba and 'proba' not in outputs:
+            outputs['proba'] = model.predict_proba(_model_input(model, self._split_features(split)))
+        if 'pred' not in outputs:
+            outputs['pred'] = model.predict(_model_input(model, self._split_features(split)))
+        return outputs
+    
+    def get_predictions(self, name, split='test'):
+        """Cached class predictions of a model (or the ensemble) on the train or test split"""
+        return self._cached_outputs(name, split, need_proba=False)['pred']
+    
+    def get_probabilities(self, name, split='test'):
+        """Cached class probabilities of a model (or the ensemble) on the train or test split"""
+        return self._cached_outputs(name, split, need_proba=True)['proba']
+    
     def generate_visualizations(self):
         plt.style.use('default')
         plt.figure(figsize=(12,6))
         
         model_names = list(self.models.keys())
-        test_accuracies = [accuracy_score(self.y_test, model.predict(self.X_test)) for model in self.models.values()]
-        
         if self.ensemble_model:
-            model_names.append('Hybrid Ensemble')
-            ensemble_pred = self.ensemble_model.predict(self.X_test)
-            test_accuracies.append(accuracy_score(self.y_test, ensemble_pred))
+            model_names.append(ENSEMBLE_NAME)
+        test_accuracies = [accuracy_score(self.y_test, self.get_predictions(name)) for name in model_names]
         
         plt.subplot(1,2,1)
         bars = plt.bar(model_names, test_accuracies, color=['#10b981','#3b82f6','#8b5cf6','#f59e0b','#ef4444'])
@@ -140,11 +490,7 @@ class HybridMLEngine:
         
         plt.subplot(1,2,2)
         best_model_name = model_names[np.argmax(test_accuracies)]
-        if best_model_name == 'Hybrid Ensemble':
-            best_pred = self.ensemble_model.predict(self.X_test)
-        else:
-            best_pred = self.models[best_model_name].predict(self.X_test)
-        cm = confusion_matrix(self.y_test, best_pred)
+        cm = confusion_matrix(self.y_test, self.get_predictions(best_model_name))
         sns.heatmap(cm, annot=True, fmt='d', cmap='Blues')
         plt.title(f'Confusion Matrix - {best_model_name}')
         plt.ylabel('True Label')
@@ -158,8 +504,8 @@ class HybridMLEngine:
     def get_feature_importance(self):
         importance_data = {}
         for name in ['Random Forest', 'Gradient Boosting']:
-            if name in self.models:
-                importance = self.models[name].feature_importances_
+            importance = getattr(self.models.get(name), 'feature_importances_', None)
+            if importance is not None:
                 importance_data[name] = dict(zip(self.feature_names, importance))
         return importance_data
     
@@ -173,42 +519,185 @@ class HybridMLEngine:
             },
             'model_performance': {},
             'feature_importance': self.get_feature_importance(),
-            'ensemble_performance': None
+            'model_timings': self.model_timings,
+            'tuned_params': self.tuned_params,
+            'ensemble_performance': None,
+            'ensemble_weights': self.ensemble_weights
         }
-        for name, model in self.models.items():
-            pred = model.predict(self.X_test)
+        for name in self.models:
+            pred = self.get_predictions(name)
             report['model_performance'][name] = {
                 'accuracy': float(accuracy_score(self.y_test, pred)),
                 'classification_report': classification_report(self.y_test, pred, output_dict=True)
             }
         if self.ensemble_model:
-            ensemble_pred = self.ensemble_model.predict(self.X_test)
+            ensemble_pred = self.get_predictions(ENSEMBLE_NAME)
             report['ensemble_performance'] = {
                 'accuracy': float(accuracy_score(self.y_test, ensemble_pred)),
                 'classification_report': classification_report(self.y_test, ensemble_pred, output_dict=True)
             }
         return report
 
+    def save_pipeline(self, directory):
+        """Save the fitted preprocessing, models and ensemble weights for later scoring.
+        
+        Models are written uncompressed with joblib so their arrays can be
+        memory-mapped on load instead of copied into every scoring process.
+        """
+        os.makedirs(directory, exist_ok=True)
+        model_files = {}
+        for name, model in self.models.items():
+            file_name = re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_') + '.joblib'
+            joblib.dump(model, os.path.join(directory, file_name))
+            model_files[name] = file_name
+        
+        joblib.dump({'scaler': self.scaler, 'label_encoder': self.label_encoder,
+                     'feature_encoder': self.feature_encoder},
+                    os.path.join(directory, 'preprocessing.joblib'))
+        
+        metadata = {
+            'target_name': self.target_name,
+            'target_encoded': self.target_encoded,
+            'encoding': self.encoding,
+            'raw_feature_columns': self.raw_feature_columns,
+            'categorical_features': self.categorical_features,
+            'feature_names': self.feature_names,
+            'model_files': model_files,
+            'ensemble_weights': self.ensemble_weights
+        }
+        with open(os.path.join(directory, PIPELINE_METADATA), 'w') as f:
+            json.dump(metadata, f, indent=2)
+        
+        print(f"Pipeline saved to: {directory}")
+        return directory
+    
+    @classmethod
+    def load_pipeline(cls, directory, mmap_mode='c'):
+        """Load a pipeline written by ``save_pipeline`` without retraining anything
+        
+        The default copy-on-write mapping shares model arrays between processes while
+        keeping them writable, which libsvm requires at predict time.
+        """
+        with open(os.path.join(directory, PIPELINE_METADATA)) as f:
+            metadata = json.load(f)
+        
+        engine = cls()
+        preprocessing = joblib.load(os.path.join(directory, 'preprocessing.joblib'))
+        engine.scaler = preprocessing['scaler']
+        engine.label_encoder = preprocessing['label_encoder']
+        engine.feature_encoder = preprocessing.get('feature_encoder')
+        engine.encoding = metadata.get('encoding', 'dense')
+        engine.target_name = metadata['target_name']
+        engine.target_encoded = metadata['target_encoded']
+        engine.raw_feature_columns = metadata['raw_feature_columns']
+        engine.categorical_features = metadata['categorical_features']
+        engine.feature_names = metadata['feature_names']
+        engine.models = {
+            name: joblib.load(os.path.join(directory, file_name), mmap_mode=mmap_mode)
+            for name, file_name in metadata['model_files'].items()
+        }
+        engine.ensemble_weights = metadata['ensemble_weights']
+        if engine.ensemble_weights:
+            engine.ensemble_model = PrefitSoftVotingEnsemble(engine.models, engine.ensemble_weights)
+        return engine
+    
+    def predict(self, X, model_name=None):
+        """Predict target labels for raw feature rows with the fitted pipeline
+        
+        Uses the ensemble when available, otherwise ``model_name`` (or the first model).
+        """
+        if model_name is None and self.ensemble_model is not None:
+            model = self.ensemble_model
+        else:
+            model = self.models[model_name or next(iter(self.models))]
+        
+        X_raw = X[self.raw_feature_columns]
+        if self.feature_encoder is not None:
+            X_model = self.feature_encoder.transform(X_raw)
+        else:
+            X_model = self.scaler.transform(self._encode_features(X_raw))
+        predictions = model.predict(_model_input(model, X_model))
+        if self.target_encoded:
+            predictions = self.label_encoder.inverse_transform(predictions)
+        return predictions
+    
+    def predict_csv(self, input_path, output_path, chunksize=PREDICT_CHUNK_ROWS, model_name=None):
+        """Stream a CSV of new rows through the pipeline, writing predictions chunk by chunk"""
+        dtype = {col: str for col in self.categorical_features}
+        prediction_column = f"predicted_{self.target_name}"
+        n_rows = 0
+        
+        for i, chunk in enumerate(iter_csv_chunks(input_path, chunksize, dtype=dtype)):
+            chunk[prediction_column] = self.predict(chunk, model_name=model_name)
+            chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+            n_rows += len(chunk)
+        
+        print(f"Scored {n_rows} rows, predictions saved to: {output_path}")
+        return n_rows
+
 def main():
-    if len(sys.argv) < 3:
-        print("Usage: python hybrid_ml_engine.py <csv_file_path> <target_column>")
+    parser = argparse.ArgumentParser(description="Train and evaluate the hybrid ML ensemble")
+    parser.add_argument('csv_file_path')
+    parser.add_argument('target_column', nargs='?')
+    parser.add_argument('--parallel', action='store_true', help="train models concurrently in worker processes")
+    parser.add_argument('--n-jobs', type=int, default=None, help="total cores to use (default: all)")
+    parser.add_argument('--cache-format', choices=['feather', 'parquet'], default=None,
+                        help="cache the typed dataset in --ingestion-cache for faster re-runs")
+    parser.add_argument('--ingestion-cache', default=INGESTION_CACHE_DIR,
+                        help="directory for cached CSV schemas and typed datasets")
+    parser.add_argument('--downcast', action='store_true',
+                        help="shrink numeric columns (int32, exact float32) to save memory")
+    parser.add_argument('--encoding', choices=ENCODING_MODES, default='dense',
+                        help="feature encoding; sparse modes keep high-cardinality columns small")
+    parser.add_argument('--boosting', choices=BOOSTING_BACKENDS, default='exact',
+                        help="gradient boosting backend; 'hist' bins features and is multithreaded")
+    parser.add_argument('--early-stopping', action='store_true',
+                        help="stop boosting once a held-out validation score stops improving")
+    parser.add_argument('--tune', action='store_true',
+                        help="tune hyperparameters with successive halving before training")
+    parser.add_argument('--tune-candidates', type=int, default=27, help="configurations sampled per model")
+    parser.add_argument('--tuning-cache', default=DEFAULT_CACHE_DIR,
+                        help="directory of cached fold scores, reused to resume interrupted tuning")
+    parser.add_argument('--stacking', action='store_true',
+                        help="learn ensemble weights from out-of-fold predictions")
+    parser.add_argument('--model-dir', default=None,
+                        help="save the trained pipeline here, or load it from here with --predict")
+    parser.add_argument('--predict', action='store_true',
+                        help="score csv_file_path with the pipeline in --model-dir instead of training")
+    parser.add_argument('--output', default='ml_predictions.csv', help="predictions file for --predict")
+    parser.add_argument('--chunksize', type=int, default=PREDICT_CHUNK_ROWS, help="rows per scoring chunk")
+    args = parser.parse_args()
+    
+    if args.predict:
+        if not args.model_dir:
+            parser.error("--predict requires --model-dir")
+        ml_engine = HybridMLEngine.load_pipeline(args.model_dir)
+        ml_engine.predict_csv(args.csv_file_path, args.output, chunksize=args.chunksize)
         return
+    if not args.target_column:
+        parser.error("target_column is required for training")
     
-    file_path = sys.argv[1]
-    target_column = sys.argv[2]
+    file_path = args.csv_file_path
+    target_column = args.target_column
     
-    ml_engine = HybridMLEngine()
+    ml_engine = HybridMLEngine(boosting=args.boosting, early_stopping=args.early_stopping)
     
-    if not ml_engine.load_dataset(file_path):
+    if not ml_engine.load_dataset(file_path, cache_format=args.cache_format, downcast=args.downcast,
+                                 cache_dir=args.ingestion_cache):
         return
-    if not ml_engine.prepare_data(target_column):
+    if not ml_engine.prepare_data(target_column, encoding=args.encoding):
         return
     
+    if args.tune:
+        print("\n=== Tuning Hyperparameters ===")
+        ml_engine.tune_hyperparameters(n_candidates=args.tune_candidates, n_jobs=args.n_jobs,
+                                       cache_dir=args.tuning_cache)
+    
     print("\n=== Training Individual Models ===")
-    individual_results = ml_engine.train_individual_models()
+    individual_results = ml_engine.train_individual_models(parallel=args.parallel, n_jobs=args.n_jobs)
     
     print("\n=== Creating Hybrid Ensemble ===")
-    ensemble_accuracy = ml_engine.create_hybrid_ensemble()
+    ensemble_accuracy = ml_engine.create_hybrid_ensemble(stacking=args.stacking)
     
     print("\n=== Generating Visualizations ===")
     viz_file = ml_engine.generate_visualizations()
@@ -218,6 +707,9 @@ def main():
     with open('ml_analysis_report.json', 'w') as f:
         json.dump(report, f, indent=2)
     
+    if args.model_dir:
+        ml_engine.save_pipeline(args.model_dir)
+    
     print("\nAnalysis complete!")
     print(f"Report saved to: ml_analysis_report.json")
     print(f"Visualizations saved to: {viz_file}")
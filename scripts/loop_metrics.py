@@ -0,0 +1,210 @@
+import bisect
+import cProfile
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Stages of a capture/recognition loop, in frame order
+STAGES = ('grab', 'convert', 'detect', 'predict', 'draw', 'display', 'write')
+STAGE_WINDOW = 600  # rolling window of observations kept per stage
+HISTOGRAM_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0)  # seconds
+FLUSH_INTERVAL = 5.0  # seconds between metrics file rewrites
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Opt-in switches; the attendance loops are started from the GUI so they are read from the environment
+metrics_dir = os.environ.get("ATTENDANCE_METRICS_DIR")
+metrics_port = os.environ.get("ATTENDANCE_METRICS_PORT")
+profile_enabled = os.environ.get("ATTENDANCE_PROFILE", "") not in ("", "0")
+
+
+class LoopMetrics:
+    """Per-stage timing for a camera loop, kept as rolling windows.
+
+    Time a stage with ``with metrics.stage('detect'): ...`` (or ``observe`` for
+    a duration measured elsewhere) and call ``frame_done()`` once per frame.
+    Snapshots are rewritten to ``metrics_path`` every ``FLUSH_INTERVAL`` seconds
+    and, when ``port`` is set, served as Prometheus text on ``/metrics``
+    (lifetime cumulative histograms, so they never go down between scrapes).
+    With ``profile_path`` the whole session also runs under cProfile.
+    """
+
+    def __init__(self, loop, window=STAGE_WINDOW, metrics_path=None, port=None, profile_path=None):
+        self.loop = loop
+        self.metrics_path = metrics_path
+        self.port = port
+        self.profile_path = profile_path
+        self.window = window
+        self.samples = {name: deque(maxlen=window) for name in STAGES}
+        self.totals = {name: [0, 0.0] for name in STAGES}  # lifetime count and sum, as Prometheus expects
+        self.bucket_totals = {name: [0] * len(HISTOGRAM_BUCKETS) for name in STAGES}  # lifetime, cumulative
+        self.frames = 0
+        self.started = None
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self._server = None
+        self._profiler = None
+
+    def __enter__(self):
+        self.started = time.time()
+        if self.port:
+            self._start_server()
+        if self.profile_path:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        # A failed metrics write must not mask an error raised by the loop itself
+        try:
+            self.close()
+        except OSError as e:
+            print(f"Could not write loop metrics: {e}")
+        return False
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            self.samples.setdefault(name, deque(maxlen=self.window)).append(seconds)
+            total = self.totals.setdefault(name, [0, 0.0])
+            total[0] += 1
+            total[1] += seconds
+            buckets = self.bucket_totals.setdefault(name, [0] * len(HISTOGRAM_BUCKETS))
+            for i in range(bisect.bisect_left(HISTOGRAM_BUCKETS, seconds), len(buckets)):
+                buckets[i] += 1
+
+    def frame_done(self):
+        self.frames += 1
+        if self.metrics_path and time.perf_counter() - self._last_flush > FLUSH_INTERVAL:
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Could not write loop metrics: {e}")
+
+    def snapshot(self):
+        with self._lock:
+            windows = {name: np.asarray(values) for name, values in self.samples.items()}
+            totals = {name: list(total) for name, total in self.totals.items()}
+
+        stages = {}
+        for name, values in windows.items():
+            if not len(values):
+                continue
+            p50, p90, p99 = np.percentile(values, [50, 90, 99]) * 1000
+            stages[name] = {
+                'count': totals[name][0],
+                'window': len(values),
+                'mean_ms': float(values.mean() * 1000),
+                'p50_ms': float(p50),
+                'p90_ms': float(p90),
+                'p99_ms': float(p99),
+                'histogram': {
+                    str(bound): int((values <= bound).sum()) for bound in HISTOGRAM_BUCKETS
+                }
+            }
+        elapsed = time.time() - self.started if self.started else 0.0
+        return {
+            'loop': self.loop,
+            'started': self.started,
+            'frames': self.frames,
+            'fps': self.frames / elapsed if elapsed else None,
+            'stages': stages
+        }
+
+    def prometheus_text(self):
+        """Lifetime per-stage histograms in the Prometheus text exposition format"""
+        with self._lock:
+            totals = {name: list(total) for name, total in self.totals.items()}
+            bucket_totals = {name: list(buckets) for name, buckets in self.bucket_totals.items()}
+
+        lines = [
+            "# HELP attendance_stage_seconds Per-stage latency since the loop started",
+            "# TYPE attendance_stage_seconds histogram",
+        ]
+        for name, (count, seconds) in totals.items():
+            if not count:
+                continue
+            labels = f'loop="{self.loop}",stage="{name}"'
+            for bound, bucket_count in zip(HISTOGRAM_BUCKETS, bucket_totals[name]):
+                lines.append(f'attendance_stage_seconds_bucket{{{labels},le="{bound}"}} {bucket_count}')
+            lines.append(f'attendance_stage_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'attendance_stage_seconds_sum{{{labels}}} {seconds:.6f}')
+            lines.append(f'attendance_stage_seconds_count{{{labels}}} {count}')
+        lines.append("# TYPE attendance_frames_total counter")
+        lines.append(f'attendance_frames_total{{loop="{self.loop}"}} {self.frames}')
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        if not self.metrics_path:
+            return
+        self._last_flush = time.perf_counter()
+        os.makedirs(os.path.dirname(self.metrics_path) or ".", exist_ok=True)
+        # Write-then-rename so a reader never sees a half-written file
+        tmp_path = f"{self.metrics_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, self.metrics_path)
+
+    def close(self):
+        try:
+            if self._profiler:
+                profiler, self._profiler = self._profiler, None
+                profiler.disable()
+                os.makedirs(os.path.dirname(self.profile_path) or ".", exist_ok=True)
+                profiler.dump_stats(self.profile_path)
+            self.flush()
+        finally:
+            if self._server:
+                self._server.shutdown()
+                self._server.server_close()
+                self._server = None
+
+    def _start_server(self):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer(("127.0.0.1", int(self.port)), Handler)
+        except OSError as e:
+            print(f"Metrics endpoint disabled: {e}")
+            return
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+
+def session_metrics(loop):
+    """LoopMetrics for one capture session, configured from the ATTENDANCE_METRICS_* environment"""
+    stamp = time.strftime("%Y-%m-%d_%H-%M-%S")
+    return LoopMetrics(
+        loop,
+        metrics_path=os.path.join(metrics_dir, f"{loop}.json") if metrics_dir else None,
+        port=metrics_port,
+        profile_path=os.path.join(metrics_dir or os.path.join(SCRIPTS_DIR, "Metrics"), f"{loop}_{stamp}.prof")
+        if profile_enabled else None
+    )
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import math
+import os
+import time
+
+import joblib
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, get_scorer
+from sklearn.model_selection import KFold, ParameterSampler, StratifiedKFold
+
+DEFAULT_CACHE_DIR = '.tuning_cache'
+
+
+def _trial_key(data_fingerprint, estimator, params, n_resources, fold, n_splits, random_state, split_fingerprint):
+    payload = json.dumps({
+        'data': data_fingerprint,
+        'estimator': type(estimator).__name__,
+        'base_params': repr(sorted(estimator.get_params(deep=False).items())),
+        'params': repr(sorted(params.items())),
+        'n_resources': n_resources,
+        'fold': fold,
+        'n_splits': n_splits,
+        'random_state': random_state,
+        'split': split_fingerprint
+    }, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _score_fold(estimator, params, X, y, train_idx, test_idx, cache_path):
+    """Fit one candidate on one fold; the score is written to disk as soon as it exists"""
+    model = clone(estimator).set_params(**params)
+    model.fit(X[train_idx], y[train_idx])
+    score = float(accuracy_score(y[test_idx], model.predict(X[test_idx])))
+    if cache_path:
+        with open(cache_path, 'w') as f:
+            json.dump({'score': score}, f)
+    return score
+
+
+def _read_cached_score(cache_path):
+    if not cache_path or not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path) as f:
+            return json.load(f)['score']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _subsample_order(y, random_state):
+    """Stratified row order: every prefix keeps roughly the class balance of ``y``"""
+    rng = np.random.default_rng(random_state)
+    order = rng.permutation(len(y))
+    # Interleave classes by sorting on (rank within class / class size)
+    _, inverse, counts = np.unique(y[order], return_inverse=True, return_counts=True)
+    rank = np.zeros(len(order))
+    for cls in range(len(counts)):
+        members = np.flatnonzero(inverse == cls)
+        rank[members] = np.arange(len(members)) / counts[cls]
+    return order[np.argsort(rank, kind='stable')]
+
+
+def successive_halving_search(estimator, param_space, X, y, n_candidates=27, factor=3, cv=3,
+                              min_resources=None, n_jobs=None, cache_dir=DEFAULT_CACHE_DIR,
+                              search_overrides=None, random_state=42):
+    """Budget-aware hyperparameter search with successive halving.
+
+    ``n_candidates`` configurations are sampled from ``param_space`` (lists or
+    scipy distributions) and cross-validated on a small stratified subsample.
+    After each rung only the best 1/``factor`` survive and the number of rows
+    grows by ``factor``, so most of the compute goes to promising candidates.
+    All (candidate, fold) fits of a rung run in parallel, and each fold score is
+    cached under ``cache_dir`` so an interrupted search resumes where it stopped.
+    ``search_overrides`` are fixed params applied only while searching (e.g.
+    switching off an expensive option that does not affect the score).
+    """
+    y = np.asarray(y)
+    n_samples = len(y)
+    n_classes = len(np.unique(y))
+    search_overrides = search_overrides or {}
+
+    candidates = [
+        {name: value.item() if isinstance(value, np.generic) else value for name, value in params.items()}
+        for params in ParameterSampler(param_space, n_iter=n_candidates, random_state=random_state)
+    ]
+    n_rungs = max(int(math.ceil(math.log(max(len(candidates), 1), factor))) + 1, 1)
+    if min_resources is None:
+        min_resources = max(n_samples // factor ** (n_rungs - 1), 2 * cv * n_classes)
+
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    data_fingerprint = joblib.hash((X, y))
+    order = _subsample_order(y, random_state)
+
+    history = []
+    survivors = candidates
+    for rung in range(n_rungs):
+        n_resources = min(min_resources * factor ** rung, n_samples)
+        if rung == n_rungs - 1:
+            n_resources = n_samples
+        rows = np.sort(order[:n_resources])
+        X_rung, y_rung = X[rows], y[rows]
+        # Small early rungs of imbalanced data may not have cv members in every class
+        n_splits = max(min(cv, int(np.unique(y_rung, return_counts=True)[1].min())), 2)
+        folds = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state).split(rows, y_rung))
+
+        scores = np.full((len(survivors), n_splits), np.nan)
+        pending = []
+        for c, params in enumerate(survivors):
+            search_params = {**params, **search_overrides}
+            for f, (train_idx, test_idx) in enumerate(folds):
+                cache_path = None
+                if cache_dir:
+                    # The rows actually trained and scored on, so a different cv or seed never reuses a score
+                    split_fingerprint = joblib.hash((rows[train_idx], rows[test_idx]))
+                    key = _trial_key(data_fingerprint, estimator, search_params, n_resources, f,
+                                     n_splits, random_state, split_fingerprint)
+                    cache_path = os.path.join(cache_dir, f"{key}.json")
+                cached = _read_cached_score(cache_path)
+                if cached is not None:
+                    scores[c, f] = cached
+                else:
+                    pending.append((c, f, search_params, train_idx, test_idx, cache_path))
+
+        fresh = Parallel(n_jobs=n_jobs)(
+            delayed(_score_fold)(estimator, params, X_rung, y_rung, train_idx, test_idx, cache_path)
+            for _, _, params, train_idx, test_idx, cache_path in pending
+        )
+        for (c, f, *_), score in zip(pending, fresh):
+            scores[c, f] = score
+
+        mean_scores = scores.mean(axis=1)
+        history.append({
+            'rung': rung,
+            'n_resources': int(n_resources),
+            'n_candidates': len(survivors),
+            'n_cached': int(scores.size - len(pending)),
+            'candidates': [
+                {'params': params, 'mean_score': float(score)}
+                for params, score in zip(survivors, mean_scores)
+            ]
+        })
+
+        ranking = np.argsort(-mean_scores, kind='stable')
+        if rung < n_rungs - 1:
+            n_keep = max(int(math.ceil(len(survivors) / factor)), 1)
+            survivors = [survivors[i] for i in ranking[:n_keep]]
+        else:
+            best = ranking[0]
+            best_params, best_score = survivors[best], float(mean_scores[best])
+
+    return {
+        'best_params': best_params,
+        'best_score': best_score,
+        'history': history
+    }
+
+
+def _evaluate_fold(estimator, X, y, train_idx, test_idx, scoring):
+    """Fit and score one model on one fold; failures are returned rather than raised"""
+    try:
+        start = time.perf_counter()
+        model = clone(estimator).fit(X[train_idx], y[train_idx])
+        result = {
+            'score': float(get_scorer(scoring)(model, X[test_idx], y[test_idx])),
+            'fit_time': time.perf_counter() - start
+        }
+    except Exception as e:
+        return {'error': str(e)}
+    # Report the size of fitted reductions (e.g. PCA with a variance target) inside pipelines
+    for step in getattr(model, 'named_steps', {}).values():
+        if hasattr(step, 'n_components_'):
+            result['n_components'] = int(step.n_components_)
+    return result
+
+
+def compare_models(estimators, X, y, cv=5, scoring='accuracy', stratified=True, n_jobs=None,
+                   cache=None, random_state=42):
+    """Cross-validate several models on one shared fold split.
+
+    Every (model, fold) fit runs as its own job, so all models advance in
+    parallel instead of one ``cross_val_score`` after another. ``cache`` is an
+    optional dict of fold results keyed by data, split and model parameters;
+    passing the same dict again means only new or changed models are fitted.
+    Results for any other data or split are dropped from it, so the cache
+    only ever holds one dataset's folds.
+    Returns ``{name: [fold result, ...]}`` where each result has ``score`` and
+    ``fit_time``, or ``error``.
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    splitter_class = StratifiedKFold if stratified else KFold
+    splitter = splitter_class(n_splits=cv, shuffle=True, random_state=random_state)
+    folds = list(splitter.split(X, y))
+    split_fingerprint = joblib.hash((X, y, type(splitter).__name__, cv, random_state, scoring))
+    cache = {} if cache is None else cache
+    for key in [key for key in cache if key[0] != split_fingerprint]:
+        del cache[key]
+
+    results = {name: [None] * len(folds) for name in estimators}
+    pending = []
+    for name, estimator in estimators.items():
+        model_fingerprint = joblib.hash(estimator)
+        for f in range(len(folds)):
+            key = (split_fingerprint, model_fingerprint, f)
+            if key in cache:
+                results[name][f] = cache[key]
+            else:
+                pending.append((name, f, key))
+
+    fresh = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluate_fold)(estimators[name], X, y, *folds[f], scoring)
+        for name, f, _ in pending
+    )
+    for (name, f, key), result in zip(pending, fresh):
+        results[name][f] = result
+        if 'error' not in result:
+            cache[key] = result
+    return results
@@ -0,0 +1,199 @@
+import datetime
+import hashlib
+import json
+import os
+
+import joblib
+import numpy as np
+
+RECOMMEND_CHUNK_ROWS = 100000  # (user, item) pairs scored per predict call
+RECOMMENDATION_STORE_PATH = os.path.join('models', 'recommendations.json')
+
+
+def top_n(scores, n):
+    """Indices and scores of the ``n`` highest scores in each row, best first.
+
+    ``argpartition`` finds the top ``n`` in linear time; only those are sorted.
+    """
+    scores = np.atleast_2d(scores)
+    n = min(n, scores.shape[1])
+    if n <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty
+    top = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def score_catalogue(model, user_profiles, item_features, chunk_size=RECOMMEND_CHUNK_ROWS):
+    """Predicted score of every item for every user, shape (n_users, n_items).
+
+    Model rows are ``[user features | item features]``. The users x items
+    cross product is scored a chunk at a time: several whole users per chunk
+    when the catalogue fits in ``chunk_size`` rows, otherwise one user and
+    ``chunk_size`` items per chunk, so at most ``chunk_size`` pair rows exist
+    at once.
+    """
+    users = np.atleast_2d(np.asarray(user_profiles, dtype=np.float64))
+    items = np.atleast_2d(np.asarray(item_features, dtype=np.float64))
+    n_items = len(items)
+    scores = np.empty((len(users), n_items))
+
+    if n_items > chunk_size:
+        for u, user in enumerate(users):
+            for start in range(0, n_items, chunk_size):
+                block = items[start:start + chunk_size]
+                pairs = np.hstack([np.broadcast_to(user, (len(block), len(user))), block])
+                scores[u, start:start + len(block)] = model.predict(pairs)
+        return scores
+
+    users_per_chunk = max(chunk_size // max(n_items, 1), 1)
+    for start in range(0, len(users), users_per_chunk):
+        block = users[start:start + users_per_chunk]
+        pairs = np.hstack([np.repeat(block, n_items, axis=0), np.tile(items, (len(block), 1))])
+        scores[start:start + len(block)] = model.predict(pairs).reshape(len(block), n_items)
+    return scores
+
+
+def recommend_batch(model, user_profiles, item_features, n_recommendations=5, exclude=None,
+                    chunk_size=RECOMMEND_CHUNK_ROWS):
+    """Top-N item indices and scores for a batch of users.
+
+    ``exclude`` is an optional boolean (n_users, n_items) mask of items that
+    must not be recommended (e.g. already completed). Excluded items score
+    ``-inf``; when fewer than ``n_recommendations`` items remain they still
+    fill the rectangular result, so pass it through ``finite_rows``.
+    """
+    scores = score_catalogue(model, user_profiles, item_features, chunk_size)
+    if exclude is not None:
+        scores[np.asarray(exclude, dtype=bool)] = -np.inf
+    return top_n(scores, n_recommendations)
+
+
+def finite_rows(indices, scores):
+    """Per-user ``(indices, scores)`` lists without the excluded (non-finite) entries"""
+    keep = np.isfinite(scores)
+    return [(row[mask].tolist(), row_scores[mask].tolist())
+            for row, row_scores, mask in zip(indices, scores, keep)]
+
+
+def _json_scalar(value):
+    """``json.dump`` fallback for numpy scalars such as ``np.int64`` item ids"""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def feature_hashes(user_profiles):
+    """One digest per row of ``user_profiles``, used to spot students whose features changed"""
+    users = np.ascontiguousarray(np.atleast_2d(np.asarray(user_profiles, dtype=np.float64)))
+    return [hashlib.sha1(row.tobytes()).hexdigest() for row in users]
+
+
+class RecommendationStore:
+    """Precomputed top-N recommendations per student, persisted as JSON.
+
+    Each entry keeps the hash of the features it was computed from. The store
+    also records the version of the model and item catalogue it was built
+    with. ``refresh`` only re-scores students whose features are new or
+    changed; a new model, catalogue or N invalidates everything. ``get`` is a
+    dict lookup and never runs the model, so dashboards can call it freely.
+    """
+
+    def __init__(self, path=RECOMMENDATION_STORE_PATH):
+        self.path = path
+        self.model_version = None
+        self.catalogue_version = None
+        self.n_recommendations = None
+        self.updated_at = None
+        self.entries = {}  # str(student id) -> {'features', 'items', 'scores'}
+        if path and os.path.exists(path):
+            self.load()
+
+    def load(self):
+        with open(self.path) as f:
+            data = json.load(f)
+        self.model_version = data.get('model_version')
+        self.catalogue_version = data.get('catalogue_version')
+        self.n_recommendations = data.get('n_recommendations')
+        self.updated_at = data.get('updated_at')
+        self.entries = data.get('entries', {})
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Write-then-rename so a reader never sees a half-written file
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({
+                    'model_version': self.model_version,
+                    'catalogue_version': self.catalogue_version,
+                    'n_recommendations': self.n_recommendations,
+                    'updated_at': self.updated_at,
+                    'entries': self.entries
+                }, f, default=_json_scalar)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get(self, student_id):
+        """Stored recommendations for ``student_id`` (``{'items', 'scores'}``), or None"""
+        entry = self.entries.get(str(student_id))
+        if entry is None:
+            return None
+        return {'items': entry['items'], 'scores': entry['scores']}
+
+    def refresh(self, recommender, student_ids, user_profiles, n_recommendations=5, n_jobs=-1,
+                prune=True, save=True):
+        """Bring the store up to date for ``student_ids`` with a trained ``GradientBoostingRecommender``.
+
+        Only students whose feature hash differs from the stored one are
+        scored, in one ``recommend_all`` batch. With ``prune``, students not in
+        ``student_ids`` are dropped.
+        """
+        if recommender.gbm_recommender is None or recommender.item_features is None:
+            raise ValueError("Recommender needs a trained model and an item catalogue")
+
+        keys = [str(student_id) for student_id in student_ids]
+        user_profiles = np.atleast_2d(np.asarray(user_profiles, dtype=np.float64))
+        if len(keys) != len(user_profiles):
+            raise ValueError(f"{len(keys)} student ids for {len(user_profiles)} feature rows")
+
+        model_version = joblib.hash(recommender.gbm_recommender)
+        catalogue_version = joblib.hash((recommender.item_features, recommender.item_ids))
+        if (model_version, catalogue_version, n_recommendations) != (
+                self.model_version, self.catalogue_version, self.n_recommendations):
+            self.entries = {}
+            self.model_version = model_version
+            self.catalogue_version = catalogue_version
+            self.n_recommendations = n_recommendations
+
+        hashes = feature_hashes(user_profiles)
+        stale = [i for i, (key, digest) in enumerate(zip(keys, hashes))
+                 if self.entries.get(key, {}).get('features') != digest]
+        if stale:
+            result = recommender.recommend_all(user_profiles[stale], n_recommendations, n_jobs=n_jobs)
+            for i, items, scores in zip(stale, result['recommendations'], result['scores']):
+                self.entries[keys[i]] = {'features': hashes[i], 'items': items, 'scores': scores}
+
+        removed = 0
+        if prune:
+            current = set(keys)
+            for key in [key for key in self.entries if key not in current]:
+                del self.entries[key]
+                removed += 1
+
+        self.updated_at = datetime.datetime.now().isoformat(timespec='seconds')
+        if save:
+            self.save()
+        return {
+            'refreshed': len(stale),
+            'unchanged': len(keys) - len(stale),
+            'removed': removed,
+            'model_version': self.model_version
+        }
@@ -0,0 +1,149 @@
+import numpy as np
+
+# (resource key, feature, default) in the column order of the scheduling feature matrix
+RESOURCE_FEATURES = (
+    ('classrooms', 'capacity', 30),
+    ('teachers', 'current_load', 0),
+    ('time_slots', 'preference_score', 0),
+    ('subjects', 'demand_level', 0),
+)
+DEFAULT_BLOCK_ROWS = 1_000_000
+
+
+def resource_feature_arrays(classrooms, teachers, time_slots, subjects):
+    """One feature vector per resource axis, in classroom, teacher, time slot, subject order"""
+    resources = {'classrooms': classrooms, 'teachers': teachers, 'time_slots': time_slots, 'subjects': subjects}
+    return [
+        np.asarray([item.get(feature, default) for item in resources[key]], dtype=np.float64)
+        for key, feature, default in RESOURCE_FEATURES
+    ]
+
+
+def grid_shape(arrays):
+    return tuple(len(a) for a in arrays)
+
+
+def grid_size(arrays):
+    return int(np.prod(grid_shape(arrays), dtype=np.int64))
+
+
+def grid_features(arrays, start=0, stop=None):
+    """Feature rows ``start:stop`` of the classroom x teacher x time slot x subject product.
+
+    Rows follow the nested-loop order (subject varies fastest), so row ``i``
+    is the combination ``np.unravel_index(i, grid_shape(arrays))``.
+    """
+    stop = grid_size(arrays) if stop is None else stop
+    if stop - start == grid_size(arrays):
+        # Whole grid: broadcast each axis against the others instead of indexing
+        shape = grid_shape(arrays)
+        columns = [
+            np.broadcast_to(a.reshape([-1 if axis == i else 1 for axis in range(len(shape))]), shape).ravel()
+            for i, a in enumerate(arrays)
+        ]
+        return np.column_stack(columns)
+    indices = np.unravel_index(np.arange(start, stop, dtype=np.int64), grid_shape(arrays))
+    return np.column_stack([a[idx] for a, idx in zip(arrays, indices)])
+
+
+def iter_grid_blocks(arrays, block_size=DEFAULT_BLOCK_ROWS):
+    """Yield ``(start, features)`` blocks covering the product without materializing it"""
+    total = grid_size(arrays)
+    for start in range(0, total, block_size):
+        yield start, grid_features(arrays, start, min(start + block_size, total))
+
+
+def _positions(items):
+    return {item.get('id', i): i for i, item in enumerate(items)}
+
+
+def feasibility_indexes(classrooms, teachers, time_slots, subjects):
+    """Boolean lookup tables for the hard scheduling constraints.
+
+    Optional resource fields (all absent means everything is feasible):
+      subject['enrollment']          students expected; needs a room with at least that capacity
+      teacher['subjects']            ids of the subjects the teacher is qualified for
+      teacher['unavailable_slots']   time slot ids the teacher cannot teach
+      classroom['unavailable_slots'] time slot ids the room is already booked
+    """
+    slot_pos = _positions(time_slots)
+    subject_pos = _positions(subjects)
+
+    capacity = np.asarray([room.get('capacity', 30) for room in classrooms], dtype=np.float64)
+    enrollment = np.asarray([subject.get('enrollment', 0) for subject in subjects], dtype=np.float64)
+
+    teacher_subject = np.ones((len(teachers), len(subjects)), dtype=bool)
+    teacher_slot = np.ones((len(teachers), len(time_slots)), dtype=bool)
+    for t, teacher in enumerate(teachers):
+        if 'subjects' in teacher:
+            teacher_subject[t] = False
+            teacher_subject[t, [subject_pos[s] for s in teacher['subjects'] if s in subject_pos]] = True
+        teacher_slot[t, [slot_pos[s] for s in teacher.get('unavailable_slots', ()) if s in slot_pos]] = False
+
+    room_slot = np.ones((len(classrooms), len(time_slots)), dtype=bool)
+    for c, room in enumerate(classrooms):
+        room_slot[c, [slot_pos[s] for s in room.get('unavailable_slots', ()) if s in slot_pos]] = False
+
+    return {
+        'room_fits': capacity[:, None] >= enrollment[None, :],  # classroom x subject
+        'teacher_subject': teacher_subject,                     # teacher x subject
+        'teacher_slot': teacher_slot,                           # teacher x time slot
+        'room_slot': room_slot                                  # classroom x time slot
+    }
+
+
+def pruning_report(indexes):
+    """Candidate counts before and after pruning, without enumerating the grid.
+
+    ``pruned_by`` counts the combinations violating each constraint; a
+    combination can violate several, so these may add up to more than ``pruned``.
+    """
+    room_fits, teacher_subject = indexes['room_fits'], indexes['teacher_subject']
+    teacher_slot, room_slot = indexes['teacher_slot'], indexes['room_slot']
+    n_rooms, n_subjects = room_fits.shape
+    n_teachers, n_slots = teacher_slot.shape
+
+    # feasible(c, t, s, u) = room_slot[c, s] teacher_slot[t, s] room_fits[c, u] teacher_subject[t, u]
+    # factorizes into two (classroom x teacher) matrix products
+    slots_ok = room_slot.astype(np.int64) @ teacher_slot.T.astype(np.int64)
+    subjects_ok = room_fits.astype(np.int64) @ teacher_subject.T.astype(np.int64)
+    feasible = int((slots_ok * subjects_ok).sum())
+    total = n_rooms * n_teachers * n_slots * n_subjects
+
+    return {
+        'total': total,
+        'feasible': feasible,
+        'pruned': total - feasible,
+        'pruned_by': {
+            'capacity': int((~room_fits).sum()) * n_teachers * n_slots,
+            'qualification': int((~teacher_subject).sum()) * n_rooms * n_slots,
+            'teacher_availability': int((~teacher_slot).sum()) * n_rooms * n_subjects,
+            'room_availability': int((~room_slot).sum()) * n_teachers * n_subjects
+        }
+    }
+
+
+def iter_feasible_blocks(arrays, indexes, block_size=DEFAULT_BLOCK_ROWS):
+    """Yield ``(row_indices, features)`` for the feasible combinations only.
+
+    ``row_indices`` are positions in the full product (see ``grid_features``).
+    The grid is walked a few classrooms at a time; infeasible combinations
+    are masked out before any feature row is built.
+    """
+    shape = grid_shape(arrays)
+    per_room = int(np.prod(shape[1:], dtype=np.int64))
+    rooms_per_block = max(block_size // max(per_room, 1), 1)
+
+    # Teacher-only constraints do not depend on the room, so combine them once
+    teacher_ok = indexes['teacher_slot'][:, :, None] & indexes['teacher_subject'][:, None, :]
+    for first in range(0, shape[0], rooms_per_block):
+        last = min(first + rooms_per_block, shape[0])
+        mask = (
+            teacher_ok[None]
+            & indexes['room_slot'][first:last, None, :, None]
+            & indexes['room_fits'][first:last, None, None, :]
+        )
+        rows = np.flatnonzero(mask) + first * per_room
+        if len(rows):
+            indices = np.unravel_index(rows, shape)
+            yield rows, np.column_stack([a[idx] for a, idx in zip(arrays, indices)])
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+NUMERIC_FEATURES = ['study_hours', 'attendance_rate', 'assignment_score', 'quiz_average', 'midterm_score']
+CATEGORICAL_FEATURES = ['course_code', 'department', 'section']
+PERFORMANCE_LEVELS = ['low', 'medium', 'high']
+
+
+def generate_student_dataset(n_rows=10000, n_numeric=8, n_categorical=3, cardinality=20,
+                             n_classes=3, missing_rate=0.0, random_state=42):
+    """Synthetic student table with a 'performance' target driven by the features.
+
+    ``cardinality`` is the number of distinct values of each categorical column;
+    set it high (e.g. 5000) to mimic course codes or roll numbers.
+    """
+    rng = np.random.default_rng(random_state)
+    data = {}
+
+    numeric_names = NUMERIC_FEATURES[:n_numeric] + [f"metric_{i}" for i in range(max(n_numeric - len(NUMERIC_FEATURES), 0))]
+    numeric = rng.normal(size=(n_rows, n_numeric))
+    for i, name in enumerate(numeric_names):
+        data[name] = numeric[:, i]
+
+    # The target depends on a few numeric columns and on a per-category offset
+    score = numeric[:, :min(n_numeric, 3)].sum(axis=1)
+    categorical_names = CATEGORICAL_FEATURES[:n_categorical] + [f"category_{i}" for i in range(max(n_categorical - len(CATEGORICAL_FEATURES), 0))]
+    for name in categorical_names:
+        codes = rng.integers(0, cardinality, n_rows)
+        offsets = rng.normal(scale=0.5, size=cardinality)
+        score += offsets[codes]
+        data[name] = np.asarray([f"{name[:3].upper()}{i:05d}" for i in range(cardinality)])[codes]
+
+    score += rng.normal(scale=0.5, size=n_rows)
+    labels = PERFORMANCE_LEVELS if n_classes == 3 else [f"class_{i}" for i in range(n_classes)]
+    bins = np.quantile(score, np.linspace(0, 1, n_classes + 1)[1:-1])
+    data['performance'] = np.asarray(labels)[np.digitize(score, bins)]
+
+    df = pd.DataFrame(data)
+    if missing_rate > 0:
+        for name in numeric_names:
+            df.loc[rng.random(n_rows) < missing_rate, name] = np.nan
+    return df
+
+
+def generate_attendance_records(n_students=500, n_subjects=8, n_sessions=40, random_state=42):
+    """Long-format attendance records in the layout of the Attendance/ CSVs"""
+    rng = np.random.default_rng(random_state)
+    enrollments = np.arange(1, n_students + 1)
+    subjects = [f"SUB{i:03d}" for i in range(n_subjects)]
+    dates = pd.date_range('2024-07-01', periods=n_sessions, freq='D').strftime('%Y-%m-%d')
+    presence_rate = rng.beta(8, 2, size=n_students)
+
+    n_records = n_students * n_subjects * n_sessions
+    student_idx = np.repeat(np.arange(n_students), n_subjects * n_sessions)
+    return pd.DataFrame({
+        'Enrollment': enrollments[student_idx],
+        'Name': np.char.add('Student', enrollments[student_idx].astype(str)),
+        'Subject': np.tile(np.repeat(subjects, n_sessions), n_students),
+        'Date': np.tile(dates, n_students * n_subjects),
+        'Attendance': (rng.random(n_records) < presence_rate[student_idx]).astype(np.int8)
+    })
+
+
+def attendance_summary(records):
+    """Per-student attendance rate per subject, plus an overall 'at_risk' label"""
+    summary = records.pivot_table(index='Enrollment', columns='Subject', values='Attendance', aggfunc='mean')
+    summary.columns = [f"{subject}_rate" for subject in summary.columns]
+    summary['at_risk'] = np.where(summary.mean(axis=1) < 0.75, 'yes', 'no')
+    return summary.reset_index()
+
+
+def generate_campus_resources(n_classrooms=20, n_teachers=40, n_time_slots=30, n_subjects=40, random_state=42,
+                              constraints=False):
+    """Classroom, teacher, time-slot and subject records for MLResourceScheduler.
+
+    With ``constraints=True`` the records also get the optional fields used to
+    prune infeasible combinations: subject enrollment, teacher qualifications
+    and unavailable slots, and pre-booked classroom slots.
+    """
+    rng = np.random.default_rng(random_state)
+    resources = {
+        'classrooms': [
+            {'id': f"R{i:03d}", 'capacity': int(rng.choice([30, 40, 60, 120]))}
+            for i in range(n_classrooms)
+        ],
+        'teachers': [
+            {'id': f"T{i:03d}", 'current_load': int(rng.integers(0, 20))}
+            for i in range(n_teachers)
+        ],
+        'time_slots': [
+            {'id': f"S{i:02d}", 'preference_score': float(rng.random())}
+            for i in range(n_time_slots)
+        ],
+        'subjects': [
+            {'id': f"SUB{i:03d}", 'demand_level': int(rng.integers(1, 6))}
+            for i in range(n_subjects)
+        ]
+    }
+    if not constraints:
+        return resources
+
+    # Separate stream so the base features match the unconstrained records
+    rng = np.random.default_rng(random_state + 1)
+    slot_ids = [slot['id'] for slot in resources['time_slots']]
+    subject_ids = [subject['id'] for subject in resources['subjects']]
+    for subject in resources['subjects']:
+        subject['enrollment'] = int(rng.integers(10, 121))
+    for teacher in resources['teachers']:
+        n_qualified = max(int(len(subject_ids) * rng.uniform(0.05, 0.2)), 1)
+        teacher['subjects'] = rng.choice(subject_ids, n_qualified, replace=False).tolist()
+        teacher['unavailable_slots'] = rng.choice(slot_ids, int(len(slot_ids) * 0.2), replace=False).tolist()
+    for room in resources['classrooms']:
+        room['unavailable_slots'] = rng.choice(slot_ids, int(len(slot_ids) * 0.1), replace=False).tolist()
+    return resources
+
+
+INTENT_TEMPLATES = {
+    'attendance_query': [
+        "what is my attendance in {subject}", "how many classes did i miss in {subject}",
+        "was i marked present on {day}", "am i absent too often", "show my attendance percentage",
+        "did i skip too many {subject} lectures", "how many {subject} sessions have i attended",
+    ],
+    'schedule_query': [
+        "when is my next class", "what do i have on {day}", "where is the {subject} lecture",
+        "show me the timetable for {day}", "what time does {subject} start", "which room is {subject} in",
+        "is there a lecture on {day} morning",
+    ],
+    'grade_query': [
+        "what grade did i get in {subject}", "show my marks for {subject}", "did i pass {subject}",
+        "what is my score on the {subject} exam", "how did i do in the {subject} midterm",
+        "when are the {subject} results out", "what is my gpa",
+    ],
+    'help_query': [
+        "hello", "what can you do", "help me please", "who are you", "thanks",
+        "how do i reset my password", "i need some help with the portal",
+    ],
+}
+
+
+def generate_intent_utterances(n_rows=5000, random_state=42):
+    """Labelled chatbot utterances (columns 'text' and 'intent') from filled-in templates"""
+    rng = np.random.default_rng(random_state)
+    subjects = ['maths', 'physics', 'chemistry', 'biology', 'history', 'economics', 'programming']
+    days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'tomorrow', 'today']
+    intents = list(INTENT_TEMPLATES)
+    labels = rng.choice(intents, n_rows)
+    texts = []
+    for intent in labels:
+        template = INTENT_TEMPLATES[intent][rng.integers(len(INTENT_TEMPLATES[intent]))]
+        text = template.format(subject=rng.choice(subjects), day=rng.choice(days))
+        texts.append(text.capitalize() + rng.choice(['?', '', '!', ' please']))
+    return pd.DataFrame({'text': texts, 'intent': labels})
@@ -3,6 +3,8 @@ import os
 import cv2
 import numpy as np
 
+from loop_metrics import session_metrics
+
 def TakeImage(l1, l2, haarcasecade_path, trainimage_path, message, err_screen, text_to_speech):
     if not l1 and not l2:
         t = "Please enter your Enrollment Number and Name."
@@ -36,25 +38,35 @@ def TakeImage(l1, l2, haarcasecade_path, trainimage_path, message, err_screen, t
         detector = cv2.CascadeClassifier(haarcasecade_path)
         sampleNum = 0
 
-        while True:
-            ret, img = cam.read()
-            if not ret:
-                continue
+        with session_metrics("take_image") as metrics:
+            while True:
+                with metrics.stage("grab"):
+                    ret, img = cam.read()
+                if not ret:
+                    continue
 
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            faces = detector.detectMultiScale(gray, 1.3, 5)
+                with metrics.stage("convert"):
+                    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+                with metrics.stage("detect"):
+                    faces = detector.detectMultiScale(gray, 1.3, 5)
 
-            for (x, y, w, h) in faces:
-                cv2.rectangle(img, (x, y), (x + w, y + h), (255, 0, 0), 2)
-                sampleNum += 1
-                img_name = os.path.join(path, f"{Name}_{Enrollment}_{sampleNum}.jpg")
-                cv2.imwrite(img_name, gray[y:y+h, x:x+w])
-                cv2.imshow("Frame", img)
+                for (x, y, w, h) in faces:
+                    with metrics.stage("draw"):
+                        cv2.rectangle(img, (x, y), (x + w, y + h), (255, 0, 0), 2)
+                    sampleNum += 1
+                    img_name = os.path.join(path, f"{Name}_{Enrollment}_{sampleNum}.jpg")
+                    with metrics.stage("write"):
+                        cv2.imwrite(img_name, gray[y:y+h, x:x+w])
+                    with metrics.stage("display"):
+                        cv2.imshow("Frame", img)
 
-            if cv2.waitKey(1) & 0xFF == ord("q"):
-                break
-            elif sampleNum >= 50:
-                break
+                with metrics.stage("display"):
+                    key = cv2.waitKey(1) & 0xFF
+                metrics.frame_done()
+                if key == ord("q"):
+                    break
+                elif sampleNum >= 50:
+                    break
 
         cam.release()
         cv2.destroyAllWindows()
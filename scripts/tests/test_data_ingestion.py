@@ -0,0 +1,14 @@
+import numpy as np
+import pandas as pd
+
+from data_ingestion import iter_csv_chunks, read_csv_fast
+
+
+def test_chunked_reads_match_read_csv_fast(tmp_path):
+    path = tmp_path / "data.csv"
+    pd.DataFrame(np.random.default_rng(0).standard_normal((1500, 8)) * 1e3).to_csv(path, index=False)
+
+    loaded = read_csv_fast(str(path), cache_dir=None)
+    streamed = pd.concat(list(iter_csv_chunks(str(path), 400)), ignore_index=True)
+
+    np.testing.assert_array_equal(streamed.to_numpy(), loaded.to_numpy())
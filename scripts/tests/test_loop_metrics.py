@@ -0,0 +1,25 @@
+import re
+
+from loop_metrics import HISTOGRAM_BUCKETS, LoopMetrics
+
+
+def bucket_counts(text):
+    return [int(value) for value in re.findall(r'stage="detect",le="[^"]+"} (\d+)', text)]
+
+
+def test_prometheus_histogram_is_cumulative_over_lifetime():
+    metrics = LoopMetrics('capture', window=3)
+    for seconds in (0.0005, 0.003, 0.003, 2.0):
+        metrics.observe('detect', seconds)
+    first = bucket_counts(metrics.prometheus_text())
+
+    # Slow samples push the fast ones out of the rolling window; exported counts must not drop
+    for _ in range(5):
+        metrics.observe('detect', 0.3)
+    second = bucket_counts(metrics.prometheus_text())
+
+    assert len(first) == len(HISTOGRAM_BUCKETS) + 1
+    assert first == [1, 1, 3, 3, 3, 3, 3, 3, 3, 3, 4]
+    assert all(after >= before for before, after in zip(first, second))
+    assert second[-1] == 9
+    assert 'attendance_stage_seconds_count{loop="capture",stage="detect"} 9' in metrics.prometheus_text()
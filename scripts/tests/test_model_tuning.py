@@ -0,0 +1,26 @@
+from sklearn.datasets import make_classification
+from sklearn.tree import DecisionTreeClassifier
+
+from model_tuning import successive_halving_search
+
+PARAM_SPACE = {'max_depth': [2, 3, 4, 5, 6, None], 'min_samples_leaf': [1, 2, 5, 10]}
+
+
+def search(cache_dir, **kwargs):
+    X, y = make_classification(600, random_state=0)
+    return successive_halving_search(DecisionTreeClassifier(random_state=0), PARAM_SPACE, X, y,
+                                     n_candidates=9, cache_dir=cache_dir, **kwargs)
+
+
+def test_cache_resumes_identical_search(tmp_path):
+    first = search(str(tmp_path), cv=3)
+    resumed = search(str(tmp_path), cv=3)
+    assert all(rung['n_cached'] == rung['n_candidates'] * 3 for rung in resumed['history'])
+    assert resumed['best_score'] == first['best_score']
+
+
+def test_cache_misses_on_other_folds(tmp_path):
+    search(str(tmp_path), cv=3)
+    assert [rung['n_cached'] for rung in search(str(tmp_path), cv=5)['history']] == [0, 0, 0]
+    assert [rung['n_cached'] for rung in search(str(tmp_path), cv=5, random_state=7)['history']] == [0, 0, 0]
+    assert search(str(tmp_path), cv=5)['best_score'] == search(None, cv=5)['best_score']
@@ -0,0 +1,74 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from advanced_module import load_advanced_module
+from recommendation import RecommendationStore, recommend_batch
+
+
+class CatalogueRecommender:
+    """The parts of GradientBoostingRecommender the store uses, keeping numpy item ids as given"""
+
+    def __init__(self, item_ids, n_user_features=3, seed=0):
+        rng = np.random.default_rng(seed)
+        self.item_ids = item_ids
+        self.item_features = rng.random((len(item_ids), 2))
+        X = rng.random((200, n_user_features + 2))
+        self.gbm_recommender = LinearRegression().fit(X, X @ rng.random(X.shape[1]))
+
+    def recommend_all(self, user_profiles, n_recommendations=5, n_jobs=None):
+        indices, scores = recommend_batch(self.gbm_recommender, user_profiles, self.item_features, n_recommendations)
+        return {'recommendations': [[self.item_ids[i] for i in row] for row in indices], 'scores': scores.tolist()}
+
+
+def test_store_saves_numpy_item_ids(tmp_path):
+    path = tmp_path / "recommendations.json"
+    recommender = CatalogueRecommender(pd.Series([101, 102, 103, 104], dtype='int64').to_numpy())
+    users = np.random.default_rng(1).random((5, 3))
+
+    report = RecommendationStore(str(path)).refresh(recommender, range(5), users, n_recommendations=3)
+
+    assert report['refreshed'] == 5
+    assert not os.path.exists(f"{path}.tmp")
+    with open(path) as f:
+        entries = json.load(f)['entries']
+    reloaded = RecommendationStore(str(path))
+    assert reloaded.get(0)['items'] == entries['0']['items']
+    assert set(reloaded.get(0)['items']) <= {101, 102, 103, 104}
+
+
+def test_failed_save_leaves_no_temp_file(tmp_path):
+    path = tmp_path / "recommendations.json"
+    store = RecommendationStore(str(path))
+    store.entries = {'1': {'features': 'x', 'items': [object()], 'scores': [1.0]}}
+
+    with pytest.raises(TypeError):
+        store.save()
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.fixture(scope="module")
+def advanced():
+    pytest.importorskip("tensorflow")
+    return load_advanced_module()
+
+
+def test_set_item_catalogue_converts_numpy_ids(advanced):
+    recommender = advanced.GradientBoostingRecommender()
+    recommender.set_item_catalogue(np.zeros((3, 2)), np.array([7, 8, 9], dtype=np.int64))
+    assert all(type(item) is int for item in recommender.item_ids)
+
+
+@pytest.mark.parametrize("exclude", [np.array([101, 102]), pd.Series([101, 102])])
+def test_generate_recommendations_excludes_array_ids(advanced, exclude):
+    catalogue = CatalogueRecommender(np.array([101, 102, 103, 104]))
+    recommender = advanced.GradientBoostingRecommender()
+    recommender.gbm_recommender = catalogue.gbm_recommender
+    recommender.set_item_catalogue(catalogue.item_features, catalogue.item_ids)
+
+    result = recommender.generate_recommendations(np.zeros(3), n_recommendations=4, exclude=exclude)
+    assert sorted(result['recommendations']) == [103, 104]
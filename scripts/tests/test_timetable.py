@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from timetable import TimetableSolver
+
+
+def _random_instance(seed, shape=(4, 5, 6, 5)):
+    rng = np.random.default_rng(seed)
+    size = int(np.prod(shape))
+    rows = np.sort(rng.choice(size, size // 2, replace=False))
+    return rows, rng.random(len(rows)), shape, rng.integers(1, 4, shape[3])
+
+
+def _assert_conflict_free(assignments):
+    for axis in (0, 1, 3):  # classroom, teacher, subject: at most once per slot
+        keys = [(a[axis], a[2]) for a in assignments]
+        assert len(keys) == len(set(keys))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_remove_teacher_keeps_unaffected_placements(seed):
+    rows, costs, shape, hours = _random_instance(seed)
+    solver = TimetableSolver(rows, costs, shape, hours, time_budget=5, random_state=seed)
+    before = solver.solve()['assignments']
+    teacher = before[0][1] if before else 0
+
+    after = solver.remove_teacher(teacher, time_budget=5)['assignments']
+
+    unaffected = {a for a in before if a[1] != teacher}
+    assert unaffected <= set(after)
+    assert all(a[1] != teacher for a in after)
+    _assert_conflict_free(after)
@@ -0,0 +1,176 @@
+import time
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+DEFAULT_TIME_BUDGET = 10.0  # seconds
+UNCOVERED_PENALTY = 2.0  # cost of a required session left unscheduled (worse than any placement)
+_INFEASIBLE = 1e6
+
+
+class TimetableSolver:
+    """Conflict-free timetable from scored (classroom, teacher, time slot, subject) candidates.
+
+    ``rows`` are flat positions in the ``shape`` grid (as produced by
+    ``resource_grid.iter_feasible_blocks``) and ``costs`` their cost, e.g.
+    ``1 - p(good assignment)``. ``hours[u]`` sessions of subject ``u`` have to
+    be placed, with no teacher or classroom used twice in a slot and a subject
+    at most once per slot.
+
+    The solve has two phases. First, each slot is filled greedily with two
+    min-cost matchings: subjects to teachers, then the chosen pairs to
+    classrooms. Then a local search relocates sessions to cheaper free
+    placements and fills uncovered hours until nothing improves or
+    ``time_budget`` runs out. After ``remove_teacher``, only the affected
+    sessions are repaired; every other session keeps its placement.
+    """
+
+    def __init__(self, rows, costs, shape, hours, time_budget=DEFAULT_TIME_BUDGET, random_state=42):
+        self.shape = tuple(shape)
+        self.costs = np.asarray(costs, dtype=np.float64)
+        self.c, self.t, self.s, self.u = (np.asarray(a, dtype=np.int64) for a in np.unravel_index(rows, self.shape))
+        self.hours = np.asarray(hours, dtype=np.int64)
+        self.time_budget = time_budget
+        self.rng = np.random.default_rng(random_state)
+        self.active = np.ones(len(self.costs), dtype=bool)
+
+        # Candidate ids grouped by slot and by subject, cheapest first within a subject
+        self.by_slot = np.argsort(self.s, kind='stable')
+        self.slot_bounds = np.searchsorted(self.s[self.by_slot], np.arange(self.shape[2] + 1))
+        self.by_subject = np.lexsort((self.costs, self.u))
+        self.subject_bounds = np.searchsorted(self.u[self.by_subject], np.arange(self.shape[3] + 1))
+
+        n_rooms, n_teachers, n_slots, n_subjects = self.shape
+        self.room_busy = np.zeros((n_rooms, n_slots), dtype=bool)
+        self.teacher_busy = np.zeros((n_teachers, n_slots), dtype=bool)
+        self.subject_busy = np.zeros((n_subjects, n_slots), dtype=bool)
+        self.covered = np.zeros(n_subjects, dtype=np.int64)
+        self.assigned = set()
+
+    # --- state ---------------------------------------------------------------
+
+    def _place(self, i):
+        self.room_busy[self.c[i], self.s[i]] = True
+        self.teacher_busy[self.t[i], self.s[i]] = True
+        self.subject_busy[self.u[i], self.s[i]] = True
+        self.covered[self.u[i]] += 1
+        self.assigned.add(int(i))
+
+    def _unplace(self, i):
+        self.room_busy[self.c[i], self.s[i]] = False
+        self.teacher_busy[self.t[i], self.s[i]] = False
+        self.subject_busy[self.u[i], self.s[i]] = False
+        self.covered[self.u[i]] -= 1
+        self.assigned.discard(int(i))
+
+    def _free(self, ids):
+        return (
+            self.active[ids]
+            & ~self.room_busy[self.c[ids], self.s[ids]]
+            & ~self.teacher_busy[self.t[ids], self.s[ids]]
+            & ~self.subject_busy[self.u[ids], self.s[ids]]
+        )
+
+    def _best_free(self, subject):
+        ids = self.by_subject[self.subject_bounds[subject]:self.subject_bounds[subject + 1]]
+        free = np.flatnonzero(self._free(ids))
+        return int(ids[free[0]]) if len(free) else None  # ids are sorted by cost
+
+    def objective(self):
+        missing = np.maximum(self.hours - self.covered, 0).sum()
+        return float(self.costs[list(self.assigned)].sum() + UNCOVERED_PENALTY * missing)
+
+    # --- construction ----------------------------------------------------------
+
+    def _fill_slot(self, slot, slots_left):
+        ids = self.by_slot[self.slot_bounds[slot]:self.slot_bounds[slot + 1]]
+        need = self.hours - self.covered
+        ids = ids[self._free(ids) & (need[self.u[ids]] > 0)]
+        if not len(ids):
+            return
+
+        # Subjects that still need many hours relative to the slots left go first
+        adjusted = self.costs[ids] - need[self.u[ids]] / slots_left
+
+        # Stage 1: subjects x teachers, each pair costed by its best classroom
+        teachers, t_pos = np.unique(self.t[ids], return_inverse=True)
+        subjects, u_pos = np.unique(self.u[ids], return_inverse=True)
+        pair_cost = np.full((len(subjects), len(teachers)), _INFEASIBLE)
+        np.minimum.at(pair_cost, (u_pos, t_pos), adjusted)
+        rows, cols = linear_sum_assignment(pair_cost)
+        keep = pair_cost[rows, cols] < _INFEASIBLE
+        pair_id = np.full((len(subjects), len(teachers)), -1)
+        pair_id[rows[keep], cols[keep]] = np.arange(keep.sum())
+
+        # Stage 2: chosen (subject, teacher) pairs x classrooms
+        chosen = pair_id[u_pos, t_pos] >= 0
+        ids, pairs = ids[chosen], pair_id[u_pos[chosen], t_pos[chosen]]
+        rooms, c_pos = np.unique(self.c[ids], return_inverse=True)
+        room_cost = np.full((int(keep.sum()), len(rooms)), _INFEASIBLE)
+        candidate = np.full(room_cost.shape, -1)
+        room_cost[pairs, c_pos] = self.costs[ids]
+        candidate[pairs, c_pos] = ids
+        rows, cols = linear_sum_assignment(room_cost)
+        for r, col in zip(rows, cols):
+            if room_cost[r, col] < _INFEASIBLE:
+                self._place(candidate[r, col])
+
+    # --- improvement -----------------------------------------------------------
+
+    def _improve(self, deadline, fixed=frozenset()):
+        """Fill uncovered hours and relocate sessions; sessions in ``fixed`` are never moved"""
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            # Fill uncovered hours with the cheapest free placement
+            for subject in np.flatnonzero(self.covered < self.hours):
+                while self.covered[subject] < self.hours[subject]:
+                    best = self._best_free(subject)
+                    if best is None:
+                        break
+                    self._place(best)
+                    improved = True
+            # Relocate sessions to cheaper free placements
+            for i in self.rng.permutation(sorted(self.assigned - fixed)):
+                if time.perf_counter() >= deadline:
+                    break
+                self._unplace(i)
+                best = self._best_free(self.u[i])
+                if best is not None and self.costs[best] < self.costs[i] - 1e-12:
+                    self._place(best)
+                    improved = True
+                else:
+                    self._place(i)
+
+    def solve(self):
+        deadline = time.perf_counter() + self.time_budget
+        n_slots = self.shape[2]
+        for slot in range(n_slots):
+            if time.perf_counter() >= deadline or (self.covered >= self.hours).all():
+                break
+            self._fill_slot(slot, n_slots - slot)
+        self._improve(deadline)
+        return self.solution()
+
+    def remove_teacher(self, teacher, time_budget=None):
+        """Re-solve after ``teacher`` (grid index) becomes unavailable, keeping all other sessions
+
+        Only the teacher's sessions are replaced; the replacements may be
+        relocated among themselves, but no other session moves.
+        """
+        deadline = time.perf_counter() + (self.time_budget if time_budget is None else time_budget)
+        self.active &= self.t != teacher
+        for i in [i for i in self.assigned if self.t[i] == teacher]:
+            self._unplace(i)
+        self._improve(deadline, fixed=frozenset(self.assigned))
+        return self.solution()
+
+    def solution(self):
+        """Assigned candidates as sorted grid positions, plus per-subject missing hours"""
+        ids = np.asarray(sorted(self.assigned, key=lambda i: (self.s[i], self.c[i])), dtype=np.int64)
+        return {
+            'assignments': [(int(self.c[i]), int(self.t[i]), int(self.s[i]), int(self.u[i])) for i in ids],
+            'costs': self.costs[ids].tolist(),
+            'missing_hours': {int(u): int(n) for u, n in enumerate(self.hours - self.covered) if n > 0},
+            'objective': self.objective()
+        }
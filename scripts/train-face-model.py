@@ -4,6 +4,8 @@ import cv2
 import numpy as np
 from PIL import Image
 
+from attendance_session import learn_thresholds, save_thresholds
+
 def TrainImage(haarcasecade_path, trainimage_path, trainimagelabel_path, message, text_to_speech):
     # Ensure OpenCV contrib module is available
     if not hasattr(cv2.face, "LBPHFaceRecognizer_create"):
@@ -30,6 +32,9 @@ def TrainImage(haarcasecade_path, trainimage_path, trainimagelabel_path, message
     os.makedirs(os.path.dirname(trainimagelabel_path), exist_ok=True)
     recognizer.save(trainimagelabel_path)
 
+    # Per-student acceptance thresholds used by the attendance loops
+    save_thresholds(learn_thresholds(faces, Ids), trainimagelabel_path)
+
     res = "Images trained successfully"
     if message:
         message.configure(text=res)